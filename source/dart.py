@@ -23,17 +23,41 @@
 # Version: 1.1.0 (2023.11.12)
 #############################################################################################################################
 
+import array
+import csv
 import dateparser
+import hashlib
+import heapq
+import io
+import json
+import math
+import mmap
+import multiprocessing
 import os
+import random
 import re
+import shlex
 import shutil
 import sys
 import time
 import tkinter as tk
 from tkinter import ttk
+from collections import Counter, OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 from datetime import datetime
+from itertools import accumulate
 from hydra import *
 
+try:
+	import numpy
+except ImportError:
+	numpy = None
+
+try:
+	from re import _parser as sre_parse
+except ImportError:
+	import sre_parse
+
 program = {
 	"name"     :"dart",
 	"version"  :"1.1.0",
@@ -53,6 +77,15 @@ class Configuration(BaseConfiguration):
 class Action(BaseAction):
 	"""Base Action class."""
 	
+	# Record parser engines, selected with --engine, mapped to the method that implements them
+	engines = {"python":"parse_data", "csv":"parse_data_csv"}
+	
+	# Whether files with individual outputs can be processed concurrently with --jobs
+	schedule_files = True
+	
+	# Approximate number of bytes processed by each worker process at a time
+	chunk_size = 16 * 1024 * 1024
+	
 	def standardize(self):
 		"""Standardize the user's inputs."""
 		
@@ -85,19 +118,101 @@ class Action(BaseAction):
 			except ValueError as e:
 				self.inputs["columns"] = None
 			
+		# Filter with a file of keys instead of a pattern
+		self.inputs["keys"] = self.inputs.get("keys", "")
+		
+		# File of actions to perform after this one
+		self.inputs["pipeline"] = self.inputs.get("pipeline", "")
+		
 		# Convert lines to int
-		if self.inputs["action"] in ["analyze", "head", "split-lines", "sql-import"]:
-			if (self.inputs["action"] in ["analyze", "sql-import"]) and (self.inputs["lines"] == ""): self.inputs["lines"] = 0
+		if self.inputs["action"] in ["analyze", "fixed-to-delim", "head", "split-lines", "sql-import", "tail"]:
+			self.inputs["lines"] = self.inputs.get("lines", "")
+			if (self.inputs["action"] in ["analyze", "fixed-to-delim", "sql-import"]) and (self.inputs["lines"] == ""): self.inputs["lines"] = 0
 			try:
 				self.inputs["lines"] = int(self.inputs["lines"])
 			except ValueError as e:
 				pass
 		
+		# Convert skip to int
+		self.inputs["skip"] = self.inputs.get("skip", "")
+		if self.inputs["skip"] == "": self.inputs["skip"] = 0
+		try:
+			self.inputs["skip"] = int(self.inputs["skip"])
+		except ValueError as e:
+			pass
+		
+		# Convert parts to int
+		self.inputs["parts"] = self.inputs.get("parts", "")
+		if self.inputs["parts"] == "": self.inputs["parts"] = 0
+		try:
+			self.inputs["parts"] = int(self.inputs["parts"])
+		except ValueError as e:
+			pass
+		
 		# Convert wildcards to a list of filenames
 		self.expand("input")
 	
 		# Convert \t delim to an actual tab
 		if self.inputs["delim"] == "\\t": self.inputs["delim"] = "\t"
+		
+		# Convert progress interval to int
+		self.inputs["progress-interval"] = self.inputs.get("progress-interval", "")
+		if self.inputs["progress-interval"] == "": self.inputs["progress-interval"] = ProgressTimer.interval
+		try:
+			self.inputs["progress-interval"] = int(self.inputs["progress-interval"])
+		except ValueError as e:
+			pass
+		
+		# Convert jobs to int, 0 uses every CPU
+		self.inputs["jobs"] = self.inputs.get("jobs", "")
+		if self.inputs["jobs"] == "": self.inputs["jobs"] = 1
+		try:
+			self.inputs["jobs"] = int(self.inputs["jobs"])
+			if self.inputs["jobs"] == 0: self.inputs["jobs"] = os.cpu_count() or 1
+		except ValueError as e:
+			pass
+		
+		# Convert sample to int
+		self.inputs["sample"] = self.inputs.get("sample", "")
+		if self.inputs["sample"] == "": self.inputs["sample"] = 0
+		try:
+			self.inputs["sample"] = int(self.inputs["sample"])
+		except ValueError as e:
+			pass
+		
+		# Convert cache to int
+		self.inputs["cache"] = self.inputs.get("cache", "")
+		if self.inputs["cache"] == "": self.inputs["cache"] = ValueCache.size
+		try:
+			self.inputs["cache"] = int(self.inputs["cache"])
+		except ValueError as e:
+			pass
+		
+		self.inputs["cache-file"] = self.inputs.get("cache-file", "")
+		
+		# Convert open files to int
+		self.inputs["open-files"] = self.inputs.get("open-files", "")
+		if self.inputs["open-files"] == "": self.inputs["open-files"] = WriterPool.size
+		try:
+			self.inputs["open-files"] = int(self.inputs["open-files"])
+		except ValueError as e:
+			pass
+		
+		# Convert sketch to a boolean
+		self.inputs["sketch"] = bool(self.inputs.get("sketch", False))
+		
+		# Convert plan to a boolean
+		self.inputs["plan"] = bool(self.inputs.get("plan", False))
+		
+		# Convert profile to a boolean
+		self.inputs["profile"] = bool(self.inputs.get("profile", False))
+		
+		# Convert mmap to a boolean
+		self.inputs["mmap"] = bool(self.inputs.get("mmap", False))
+		
+		# Default to the fastest parser engine
+		self.inputs["engine"] = (self.inputs.get("engine") or "").strip().lower()
+		if self.inputs["engine"] == "": self.inputs["engine"] = "csv"
 	
 	def validate(self):
 		"""Raise a ValueError if any of the user's inputs are invalid."""
@@ -124,31 +239,107 @@ class Action(BaseAction):
 				errors.append("Columns must be a comma separated list of positive integers.")
 		
 		# Validate lines
-		if self.inputs["action"] in ["analyze", "sql-import"]:
+		if self.inputs["action"] in ["analyze", "fixed-to-delim", "sql-import"]:
 			try:
 				if not isinstance(self.inputs["lines"], int): raise Exception()
 				if self.inputs["lines"] < 0: raise Exception()
 			except Exception as e:
 				errors.append("If supplied, lines must be a positive integer.")
-		elif self.inputs["action"] in ["head", "split-lines"]:
+		elif (self.inputs["action"] in ["head", "tail"]) or ((self.inputs["action"] == "split-lines") and (self.inputs["parts"] == 0)):
 			try:
 				if not isinstance(self.inputs["lines"], int): raise Exception()
 				if self.inputs["lines"] <= 0: raise Exception()
 			except Exception as e:
 				errors.append("Lines must be a positive integer.")
 		
+		# Validate parts
+		try:
+			if not isinstance(self.inputs["parts"], int): raise Exception()
+			if self.inputs["parts"] < 0: raise Exception()
+		except Exception as e:
+			errors.append("Parts must be a positive integer or 0.")
+		else:
+			if (self.inputs["action"] == "split-lines") and (self.inputs["parts"] > 0):
+				if self.inputs["lines"] != "": errors.append("Split by either lines or parts, not both.")
+				if "STDIN" in self.inputs["input"]: errors.append("Parts require input files.")
+		
+		# Validate skip
+		try:
+			if not isinstance(self.inputs["skip"], int): raise Exception()
+			if self.inputs["skip"] < 0: raise Exception()
+		except Exception as e:
+			errors.append("Skip must be a positive integer or 0.")
+		else:
+			if (self.inputs["skip"] > 0) and (self.inputs["action"] != "fixed-to-delim"): errors.append("Skip can only be used with fixed-to-delim.")
+		
+		if self.inputs["sketch"] and (self.inputs["action"] not in ["analyze", "sql-import"]): errors.append("Sketch can only be used with analyze or sql-import.")
+		if self.inputs["profile"] and (self.inputs["action"] not in ["analyze", "sql-import"]): errors.append("Profile can only be used with analyze or sql-import.")
+		
 		if len(self.inputs["input"]) == 0: errors.append("Input file(s) required.")
 		
 		if (self.inputs["action"] not in ["split-lines", "split-value"]) and (self.inputs["output"] == ""): errors.append("Output file required.")
 		
 		if (self.inputs["action"] in ["delim-to-fixed", "fixed-to-delim"]) and (self.inputs["definition"] == ""): errors.append("Definition file required.")
 		
+		if (self.inputs["action"] == "filter") and (self.inputs["keys"] != "") and (self.inputs["pattern"] != ""): errors.append("Filter with either a pattern or keys, not both.")
+		
+		if (self.inputs["pipeline"] != "") and (self.inputs["action"] not in ["combine", "filter", "head", "remove-columns", "repair", "replace-pattern", "replace-value", "sql-prepare", "tail"]): errors.append("Pipelines can't be used with {}.".format(self.inputs["action"]))
+		
 		if self.inputs["encoding"] == "": errors.append("File encoding required.")
 		
+		# Validate progress interval
+		try:
+			if not isinstance(self.inputs["progress-interval"], int): raise Exception()
+			if self.inputs["progress-interval"] < 0: raise Exception()
+		except Exception as e:
+			errors.append("Progress interval must be a positive integer or 0.")
+		
+		# Validate jobs
+		try:
+			if not isinstance(self.inputs["jobs"], int): raise Exception()
+			if self.inputs["jobs"] < 1: raise Exception()
+		except Exception as e:
+			errors.append("Jobs must be a positive integer or 0.")
+		
+		# Validate sample
+		try:
+			if not isinstance(self.inputs["sample"], int): raise Exception()
+			if self.inputs["sample"] < 0: raise Exception()
+		except Exception as e:
+			errors.append("Sample must be a positive integer or 0.")
+		else:
+			if (self.inputs["sample"] > 0) and ("STDIN" in self.inputs["input"]): errors.append("Sampling requires input files.")
+			if (self.inputs["sample"] > 0) and (self.inputs["action"] not in ["analyze", "sql-import"]): errors.append("Sample can only be used with analyze or sql-import.")
+		
+		# Validate cache
+		try:
+			if not isinstance(self.inputs["cache"], int): raise Exception()
+			if self.inputs["cache"] < 0: raise Exception()
+		except Exception as e:
+			errors.append("Cache must be a positive integer or 0.")
+		
+		# Validate open files
+		try:
+			if not isinstance(self.inputs["open-files"], int): raise Exception()
+			if self.inputs["open-files"] < 1: raise Exception()
+		except Exception as e:
+			errors.append("Open files must be a positive integer.")
+		
+		# Validate profile, only complete analyses of files can be resumed
+		if self.inputs["profile"] and (self.inputs["action"] in ["analyze", "sql-import"]):
+			if "STDIN" in self.inputs["input"]: errors.append("Profiles require input files.")
+			if (self.inputs["lines"] != 0) or (self.inputs["sample"] != 0) or self.inputs["sketch"]: errors.append("Profiles can't be used with lines, sample or sketch.")
+		
+		if self.inputs["engine"] not in self.engines: errors.append("Engine must be one of: {}.".format(", ".join(sorted(self.engines))))
+		if (self.inputs["engine"] == "numpy") and (numpy is None): errors.append("The numpy engine requires NumPy.")
+		
 		if errors: raise ValueError("\n".join(errors))
 	
-	def parse_data(self, record, delim=",", enclose="\"", escape="\""):
-		"""Parse a delimited string into a list and return it."""
+	def parse_data(self, record, delim=",", enclose="\"", escape="\"", limit=None):
+		"""Parse a delimited string into a list and return it.
+		
+		Like str.split's maxsplit, if limit is given parsing stops after that many values and the raw rest of the string after their delimiter is added as the last item.
+		"""
 		
 		ret = []
 		value = ""
@@ -180,6 +371,8 @@ class Action(BaseAction):
 						while (i < len(record)) and (record[i:i+1] != delim):
 							i += 1
 							char = record[i:i+1]
+						
+						if (len(ret) == limit) and (i < len(record)): return ret + [record[i+1:]]
 					else:
 						# Part of the field
 						value += char
@@ -190,6 +383,8 @@ class Action(BaseAction):
 						value = ""
 						in_field = False
 						enclosed = False
+						
+						if len(ret) == limit: return ret + [record[i+1:]]
 					else:
 						# Part of the field
 						value += char
@@ -201,6 +396,8 @@ class Action(BaseAction):
 					elif char == delim:
 						# Ending an empty field
 						ret.append("")
+						
+						if len(ret) == limit: return ret + [record[i+1:]]
 					elif char != " ":
 						# Starting an unenclosed field
 						value += char
@@ -213,6 +410,210 @@ class Action(BaseAction):
 		
 		return ret
 	
+	def parse_data_csv(self, record, delim=",", enclose="\"", escape="\"", limit=None):
+		"""Parse a delimited string into a list using the csv module and return it.
+		
+		Produces the same result as parse_data. Anything the csv module can't handle identically is passed to parse_data.
+		"""
+		
+		# A line of spaces has no fields
+		if record.strip(" ") == "": return []
+		
+		options = self.csv_options(delim, enclose, escape)
+		
+		if limit is not None:
+			# Splitting gives the leading values without tokenizing the rest, as long as none of them are enclosed and spaces aren't the delimiter
+			values = record.split(delim, limit)
+			if (options is not None) and (delim != " ") and ((enclose == "") or all(enclose not in value for value in values[:limit])):
+				return [value.strip() for value in values[:limit]] + values[limit:]
+			return self.parse_data(record, delim, enclose, escape, limit)
+		
+		# The csv module only escapes the enclose character by doubling it, and treats line breaks as the end of a record
+		if (options is None) or ((enclose != "") and (escape != enclose) and (enclose in record)) or ("\n" in record) or ("\r" in record): return self.parse_data(record, delim, enclose, escape)
+		
+		try:
+			return [value.strip() for value in next(csv.reader((record,), **options))]
+		except csv.Error as e:
+			# Text after a closing enclose character, unterminated enclosed fields, etc.
+			return self.parse_data(record, delim, enclose, escape)
+	
+	def csv_options(self, delim, enclose, escape):
+		"""Return the csv.reader options matching the given delimiter, enclose and escape characters, or None if there are none."""
+		
+		if not hasattr(self, "csv_cache"): self.csv_cache = {}
+		
+		key = (delim, enclose, escape)
+		if key not in self.csv_cache:
+			options = {
+				"delimiter"       :delim,
+				"quotechar"       :enclose if enclose != "" else None,
+				"quoting"         :csv.QUOTE_MINIMAL if enclose != "" else csv.QUOTE_NONE,
+				"doublequote"     :True,
+				"skipinitialspace":True,
+				"strict"          :True
+			}
+			try:
+				csv.reader((), **options)
+			except (TypeError, csv.Error) as e:
+				options = None
+			self.csv_cache[key] = options
+		
+		return self.csv_cache[key]
+	
+	def action(self):
+		"""Perform the task and return a message for the user."""
+		
+		# Process files concurrently when each one has its own output
+		individual_outputs = False
+		if (len(self.inputs["input"]) > 1) and ("STDIN" not in self.inputs["input"]):
+			(name, ext) = os.path.splitext(os.path.basename(self.inputs["input"][0]))
+			individual_outputs = (self.inputs["output"].format(f=name, e=ext) != self.inputs["output"])
+		
+		# Counts of anything else worth reporting, i.e., cache hits, and whether records were read from random parts of a file
+		self.counters = Counter()
+		self.sampled = False
+		
+		if self.schedule_files and individual_outputs and (self.inputs["jobs"] > 1):
+			i = self.schedule()
+		else:
+			i = self.process_files()
+		
+		message = "{} {} records sucessfully".format("Sampled" if self.sampled else "Processed", i)
+		if self.counters: message += " ({})".format(", ".join("{} {}".format(count, name) for (name, count) in self.counters.items()))
+		
+		return message
+	
+	def chunks(self, filename, start):
+		"""Split a file from the given byte offset to the end into chunks that end after a \\n and return a list of (start, end) tuples."""
+		
+		size = os.path.getsize(filename)
+		boundaries = [start]
+		with open(filename, mode="rb") as f:
+			while boundaries[-1] < size:
+				position = boundaries[-1] + self.chunk_size
+				f.seek(position)
+				while position < size:
+					block = f.read(64 * 1024)
+					k = block.find(b"\n")
+					if k >= 0:
+						position += k + 1
+						break
+					position += len(block)
+				boundaries.append(min(position, size))
+		
+		return list(zip(boundaries, boundaries[1:]))
+	
+	def schedule(self):
+		"""Process each input file in a worker process and return the total number of records processed.
+		
+		Errors are collected for each file and raised together once every file is done, ValueErrors are combined into one.
+		"""
+		
+		total_bytes = 0
+		for filename in self.inputs["input"]: total_bytes += os.path.getsize(filename)
+		
+		# Each worker processes one file by itself
+		inputs = dict(self.inputs)
+		inputs["jobs"] = 1
+		inputs["progress-interval"] = 0
+		
+		b = i = 0
+		errors = {}
+		started = time.time()
+		timer = ProgressTimer(self.inputs["progress-interval"])
+		with ProcessPoolExecutor(self.inputs["jobs"]) as pool:
+			futures = {pool.submit(Action.process_file, type(self), inputs, filename):filename for filename in self.inputs["input"]}
+			for future in as_completed(futures):
+				filename = futures[future]
+				try:
+					(count, counters, sampled) = future.result()
+					i += count
+					self.counters.update(counters)
+					self.sampled = self.sampled or sampled
+				except Exception as e:
+					errors[filename] = e
+				
+				b += os.path.getsize(filename)
+				if timer.due(): self.progress("Record: {}".format(i), started, b, total_bytes)
+		
+		# Anything other than a validation error is raised as is so its type isn't hidden
+		for filename in self.inputs["input"]:
+			if (filename in errors) and not isinstance(errors[filename], ValueError): raise errors[filename]
+		
+		if errors: raise ValueError("\n".join("'{}': {}".format(filename, errors[filename]) for filename in self.inputs["input"] if filename in errors))
+		
+		return i
+	
+	@staticmethod
+	def process_file(cls, inputs, filename):
+		"""Process one input file in a worker process and return the number of records processed, the action's counters and whether it sampled them."""
+		inputs = dict(inputs)
+		inputs["input"] = [filename]
+		action = cls(inputs)
+		action.counters = Counter()
+		action.sampled = False
+		return (action.process_files(), action.counters, action.sampled)
+	
+	def reader(self, f):
+		"""Return a DataReader for the given file, memory mapped if requested and possible."""
+		
+		if self.inputs["mmap"]:
+			try:
+				return MappedDataReader(f)
+			except (AttributeError, ValueError, OSError) as e:
+				pass
+		
+		return DataReader(f)
+	
+	def single_byte(self):
+		"""Return whether every character in the input encoding is one byte, with single byte line endings, so character offsets are byte offsets."""
+		
+		# Any pair of bytes that decodes to one character shows a multibyte encoding
+		probe = bytearray(2 * 256 * 256)
+		probe[0::2] = b"".join(bytes([k]) * 256 for k in range(256))
+		probe[1::2] = bytes(range(256)) * 256
+		try:
+			return (len(probe.decode(self.inputs["encoding"], "replace")) == len(probe)) and self.copyable()
+		except LookupError as e:
+			return False
+	
+	def copyable(self):
+		"""Return whether lines in the input encoding end with \\n bytes and have no byte order mark, so files can be copied without decoding them."""
+		
+		try:
+			return ("\r\n".encode(self.inputs["encoding"]) == b"\r\n") and ("".encode(self.inputs["encoding"]) == b"")
+		except LookupError as e:
+			return False
+	
+	@staticmethod
+	def copy_range(f_in, f_out, start, end):
+		"""Copy a byte range of a binary file to the current position of another, within the kernel if possible."""
+		
+		f_out.flush()
+		position = start
+		try:
+			while position < end:
+				if hasattr(os, "copy_file_range"):
+					n = os.copy_file_range(f_in.fileno(), f_out.fileno(), end - position, position)
+				else:
+					n = os.sendfile(f_out.fileno(), f_in.fileno(), position, end - position)
+				if n == 0: break
+				position += n
+		except (AttributeError, OSError) as e:
+			pass
+		
+		# Copy anything left by reading and writing it
+		f_in.seek(position)
+		while position < end:
+			block = f_in.read(min(DataReader.block_size, end - position))
+			if len(block) == 0: break
+			f_out.write(block)
+			position += len(block)
+	
+	def parse(self, record, limit=None):
+		"""Parse a delimited string into a list with the selected engine and return it, see parse_data for limit."""
+		return getattr(self, self.engines[self.inputs["engine"]])(record, self.inputs["delim"], self.inputs["enclose"], self.inputs["escape"], limit)
+	
 	def unparse_data(self, record, delim=",", enclose="\"", escape="\""):
 		"""Unparse a list into a delimited string and return it."""
 		
@@ -224,593 +625,1105 @@ class Action(BaseAction):
 class AnalyzeAction(Action):
 	"""Class to perform actions that analyze the full file and output something besides the original data."""
 	
-	def action(self):
-		"""Perform the task and return a message for the user."""
+	# The numpy engine parses records with csv and checks each column's values a batch at a time
+	engines = dict(Action.engines, numpy="parse_data_csv")
+	
+	# Number of records in each batch checked by the numpy engine
+	batch_size = 32 * 1024
+	
+	# Profiles are saved next to each input file with this extension, and are only used with the same options
+	profile_extension = ".profile"
+	profile_options = ["delim", "enclose", "escape", "encoding", "headers"]
+	
+	# Number of bytes at the start of a file, and before the end of the part that was analyzed, fingerprinted in its profile
+	fingerprint_size = 64 * 1024
+	
+	def process_files(self):
+		"""Process the input files and return the number of records processed."""
 		
 		total_bytes = 0
 		for filename in self.inputs["input"]: total_bytes += 0 if filename == "STDIN" else os.path.getsize(filename)
 		
-		# Define common date and time formats
-		date_formats = [
-			"%Y-%m-%d",
-			"%m/%d/%Y", "%d-%m-%Y", "%d.%m.%Y", "%d %B %Y", "%B %d, %Y", "%d %b %Y", "%b %d, %Y", "%d-%B-%Y", "%d-%b-%Y",
-			"%m/%d/%y", "%d-%m-%y", "%d.%m.%y", "%d %B %y", "%B %d, %y", "%d %b %y", "%b %d, %y", "%d-%B-%y", "%d-%b-%y"
-		]
-		time_formats = ["%H:%M", "%H:%M:%S", "%I:%M %p", "%I:%M:%S %p"]
-		datetime_formats = []
-		for d in date_formats:
-			for t in time_formats:
-				datetime_formats.append("{} {}".format(d, t))
+		classifier = TypeClassifier()
 		
 		# Loop over input files
 		b = i = f = 0
 		started = time.time()
-		for input_filename in self.inputs["input"]:
-			linesep = None
-			
-			# Get/format output filename
-			(name, ext) = os.path.splitext(os.path.basename(input_filename))
-			output_filename = self.inputs["output"].format(f=name, e=ext)
-			
-			# Require input/output to be different
-			if os.path.normcase(os.path.normpath(input_filename)) == os.path.normcase(os.path.normpath(output_filename)): raise ValueError("Input and output files cannot be the same.")
-			
-			# Require each input to have its own output
-			if (len(self.inputs["input"]) > 1) and (self.inputs["output"] == output_filename): raise ValueError("Each file must have its own output. Use {f} and {e}.")
-			
-			# Analyze the input file
-			fields = []
-			j = 0
-			f_in = self.open(input_filename, "r", self.inputs["encoding"])
-			try:
-				headers = self.inputs["headers"]
-				l = 0
-				reader = DataReader(f_in)
-				for line in reader:
-					b += len(line.encode(self.inputs["encoding"])) + len(reader.linesep)
-					if linesep is None: linesep = reader.linesep
-					
-					# Parse the data
-					record = self.parse_data(line, self.inputs["delim"], self.inputs["enclose"], self.inputs["escape"])
-					
-					# Initialize the field information
-					if (l == 0):
-						k = 0
-						for value in record:
-							field = {
-								"name":value if headers else "field-{}".format(k),
-								
-								"length-min":None,
-								"length-avg":0,
-								"length-max":None,
-								
-								"text-min":None,
-								"text-max":None,
-								
-								"integer":True,
-								"integer-min":None,
-								"integer-avg":0,
-								"integer-max":None,
-								
-								"decimal":True,
-								"decimal-min":None,
-								"decimal-avg":0.0,
-								"decimal-max":None,
-								
-								"date":True,
-								"date-format":None,
-								"date-min":None,
-								"date-max":None,
-								
-								"time":True,
-								"time-format":None,
-								"time-min":None,
-								"time-max":None,
-								
-								"datetime":True,
-								"datetime-format":None,
-								"datetime-min":None,
-								"datetime-max":None,
-								
-								"boolean":True,
-								
-								"empty":0,
-								"null":0,
-								
-								"values":{}
-							}
-							fields.append(field)
-							k += 1
-							
-					# Process the record
-					if not headers:
-						k = 0
-						for value in record:
-							if value == "":
-								fields[k]["empty"] += 1
-							elif (value == "NULL") or (value == "\\N"):
-								fields[k]["null"] += 1
-							else:
-								d = fields[k]
-								d["length-min"] = len(value) if d["length-min"] is None else min(len(value), d["length-min"])
-								d["length-avg"] += len(value)
-								d["length-max"] = len(value) if d["length-max"] is None else max(len(value), d["length-max"])
-								
-								d["text-min"] = value if d["text-min"] is None else min(value, d["text-min"])
-								d["text-max"] = value if d["text-max"] is None else max(value, d["text-max"])
-								
-								if d["integer"]:
-									try:
-										if (value != "0") and re.search("^0", value): raise Exception()
-										if re.search("\.", value): raise Exception()
-										
-										val = int(value)
-										d["integer-min"] = val if d["integer-min"] is None else int(min(val, d["integer-min"]))
-										d["integer-avg"] += val
-										d["integer-max"] = val if d["integer-max"] is None else int(max(val, d["integer-max"]))
-									except Exception as e:
-										d["integer"] = False
-								
-								if d["decimal"]:
-									try:
-										if re.search("^0[^\\.]", value): raise Exception()
-										
-										val = float(value)
-										d["decimal-min"] = val if d["decimal-min"] is None else min(val, d["decimal-min"])
-										d["decimal-avg"] += val
-										d["decimal-max"] = val if d["decimal-max"] is None else max(val, d["decimal-max"])
-									except Exception as e:
-										d["decimal"] = False
-								
-								def dt_helper(key, formats):
-									if d[key]:
-										val = None
-										formats = [d["{}-format".format(key)]] if d["{}-format".format(key)] is not None else formats
-										for format in formats:
-											try:
-												val = datetime.strptime(value, format)
-												d["{}-format".format(key)] = format
-												break
-											except Exception as e:
-												pass
-												
-										if val is not None:
-											if (d["{}-min".format(key)] is None) or (val < datetime.strptime(d["{}-min".format(key)], d["{}-format".format(key)])): d["{}-min".format(key)] = value
-											if (d["{}-max".format(key)] is None) or (val > datetime.strptime(d["{}-max".format(key)], d["{}-format".format(key)])): d["{}-max".format(key)] = value
-										else:
-											d[key] = False
-								
-								dt_helper("date"    , date_formats)
-								dt_helper("time"    , time_formats)
-								dt_helper("datetime", datetime_formats)
-								
-								if d["boolean"]:
-									try:
-										if value not in ["0", "1", "Y", "N", "y", "n", "Yes", "No", "YES", "NO", "yes", "no", "T", "F", "True", "False", "TRUE", "FALSE", "true", "false"]: raise Exception()
-									except Exception as e:
-										d["boolean"] = False
-								
-								if value not in d["values"]: d["values"][value] = 0
-								d["values"][value] += 1
-							
-							k += 1
-					
-					if not headers:
-						j += 1
-						i += 1
-					
-					if headers: headers = False
+		timer = ProgressTimer(self.inputs["progress-interval"])
+		
+		# Start the worker processes if needed
+		pool = None
+		if self.inputs["jobs"] > 1: pool = ProcessPoolExecutor(self.inputs["jobs"])
+		
+		try:
+			for input_filename in self.inputs["input"]:
+				linesep = None
+				
+				# Get/format output filename
+				(name, ext) = os.path.splitext(os.path.basename(input_filename))
+				output_filename = self.inputs["output"].format(f=name, e=ext)
+				
+				# Require input/output to be different
+				if os.path.normcase(os.path.normpath(input_filename)) == os.path.normcase(os.path.normpath(output_filename)): raise ValueError("Input and output files cannot be the same.")
+				
+				# Require each input to have its own output
+				if (len(self.inputs["input"]) > 1) and (self.inputs["output"] == output_filename): raise ValueError("Each file must have its own output. Use {f} and {e}.")
+				
+				# Analyze the input file
+				fields = []
+				j = 0
+				profile = self.load_profile(input_filename) if self.inputs["profile"] else None
+				f_in = self.open(input_filename, "r", self.inputs["encoding"])
+				reader = None
+				try:
+					headers = self.inputs["headers"]
+					l = 0
 					
-					l += 1
+					# Continue from the end of the part of the file that was already analyzed
+					if profile is not None:
+						fields = profile["fields"]
+						j = profile["records"]
+						linesep = profile["linesep"]
+						if len(fields) > 0: (headers, l) = (False, 1)
+						f_in.seek(profile["offset"])
 					
-					if (self.inputs["lines"] > 0) and (j >= self.inputs["lines"]): break
+					reader = self.reader(f_in) if self.inputs["sample"] == 0 else SampledDataReader(f_in)
+					if (self.inputs["sample"] > 0) and (not reader.sequential): self.sampled = True
+					if self.inputs["profile"] and (reader.raw is None): raise ValueError("Profiles require an encoding with single byte line endings.")
+					(stable, signature) = (0, None)
 					
-					if self.inputs["lines"] > 0:
-						self.progress("Record: {}".format(i), started, i, self.inputs["lines"] * len(self.inputs["input"]))
-					else:
-						self.progress("Record: {}".format(i), started, b, total_bytes)
+					# Batches depend on the records being added in order, one at a time for samples and sketches
+					batch = [] if (self.inputs["engine"] == "numpy") and (self.inputs["sample"] == 0) and (not self.inputs["sketch"]) else None
 					
-				# Clean up entirely empty fields
-				for field in fields:
-					if (field["empty"] + field["null"]) == j:
-						field["length-min"] = 0
-						field["length-max"] = 0
-						field["text-min"] = ""
-						field["text-max"] = ""
-						field["integer"] = False
-						field["decimal"] = False
-						field["date"] = False
-						field["time"] = False
-						field["datetime"] = False
-						field["boolean"] = False
-						
-			finally:
-				if f_in != sys.stdin: f_in.close()
-			
-			# Create output file contents
-			results = ""
-			if j > 0:
-				if self.inputs["action"] == "analyze":
-					data = [
-						["Column Name"],
-						["Data Type"],
-						["Minimum Length"],
-						["Average Length"],
-						["Maximum Length"],
-						["Minimum Value"],
-						["Average Value"],
-						["Maximum Value"],
-						["Empty Values"],
-						["Distinct Values"],
-						["Total Values"]
-					]
+					# Only split regular files larger than a chunk whose byte offsets can be found, sketches and samples depend on the order of the records
+					parallel = (pool is not None) and (self.inputs["lines"] == 0) and (self.inputs["sample"] == 0) and (not self.inputs["sketch"]) and (input_filename != "STDIN") and (reader.raw is not None) and (os.path.getsize(input_filename) - reader.bytes > self.chunk_size)
+					end = None # End of the last chunk analyzed in parallel
 					
-					for field in fields:
-						x = 0
+					for line in reader:
+						if linesep is None: linesep = reader.linesep
 						
-						# Column Name
-						data[x].append(field["name"])
-						x += 1
+						# Parse the data
+						record = self.parse(line)
 						
-						# Data Type
-						if field["boolean"]:
-							data[x].append("Boolean")
-						elif field["integer"]:
-							data[x].append("Integer")
-						elif field["decimal"]:
-							data[x].append("Decimal")
-						elif field["date"]:
-							data[x].append("Date")
-						elif field["time"]:
-							data[x].append("Time")
-						elif field["datetime"]:
-							data[x].append("Date/Time")
-						else:
-							data[x].append("Text")
-						x += 1
+						# Initialize the field information
+						if (l == 0):
+							for k in range(len(record)): fields.append(ColumnStats(record[k] if headers else "field-{}".format(k), self.inputs["sketch"]))
 						
-						# Minimum Length
-						data[x].append(field["length-min"])
-						x += 1
+						# Gather field information
+						if not headers:
+							if batch is None:
+								for k in range(len(record)): fields[k].add(record[k], classifier)
+							else:
+								batch.append(record)
+								if len(batch) >= self.batch_size:
+									self.add_batch(fields, batch, classifier)
+									batch = []
+							
+							j += 1
+							i += 1
+							
+							# Stop sampling once the types and length bounds of every column have held steady
+							if self.inputs["sample"] > 0:
+								previous = signature
+								signature = [(d["integer"], d["decimal"], d["date"], d["time"], d["datetime"], d["boolean"], d["length-min"], d["length-max"]) for d in fields]
+								stable = (stable + 1) if signature == previous else 0
+								if stable >= self.inputs["sample"]: break
 						
-						# Average Length
-						data[x].append(0 if (j - field["empty"] - field["null"]) == 0 else round(field["length-avg"]/(j - field["empty"] - field["null"]), 1))
-						x += 1
+						if headers: headers = False
 						
-						# Maximum Length
-						data[x].append(field["length-max"])
-						x += 1
+						l += 1
 						
-						if field["integer"]:
-							# Minimum Value
-							data[x].append(field["integer-min"])
-							x += 1
+						# Analyze the rest of the file in parallel once the first line is done and merge the results in order
+						if parallel:
+							if batch:
+								self.add_batch(fields, batch, classifier)
+								batch = []
 							
-							# Average Value
-							data[x].append("" if (j - field["empty"] - field["null"]) == 0 else round(field["integer-avg"]/(j - field["empty"] - field["null"]), 1))
-							x += 1
+							for (chunk_fields, count, end) in self.analyze_chunks(pool, input_filename, reader.bytes, len(fields)):
+								for k in range(len(fields)): fields[k].merge(chunk_fields[k])
+								j += count
+								i += count
+								
+								if timer.due(): self.progress("Record: {}".format(i), started, b + end, total_bytes)
+							break
+						
+						if (self.inputs["lines"] > 0) and (j >= self.inputs["lines"]): break
+						
+						if timer.due():
+							if self.inputs["lines"] > 0:
+								self.progress("Record: {}".format(i), started, i, self.inputs["lines"] * len(self.inputs["input"]))
+							else:
+								self.progress("Record: {}".format(i), started, b + reader.bytes, total_bytes)
+						
+					if batch: self.add_batch(fields, batch, classifier)
+					
+					offset = reader.bytes if end is None else end
+					b += offset
+					
+					if self.inputs["profile"]: self.save_profile(input_filename, fields, j, offset, linesep)
+					
+					# Clean up entirely empty fields
+					for field in fields:
+						if (field["empty"] + field["null"]) == j:
+							field["length-min"] = 0
+							field["length-max"] = 0
+							field["text-min"] = ""
+							field["text-max"] = ""
+							field["integer"] = False
+							field["decimal"] = False
+							field["date"] = False
+							field["time"] = False
+							field["datetime"] = False
+							field["boolean"] = False
 							
-							# Maximum Value
-							data[x].append(field["integer-max"])
-							x += 1
-						elif field["decimal"]:
-							# Minimum Value
-							data[x].append(field["decimal-min"])
-							x += 1
+				finally:
+					if reader is not None: reader.close()
+					if f_in != sys.stdin: f_in.close()
+				
+				# Create output file contents
+				results = ""
+				if j > 0:
+					if self.inputs["action"] == "analyze":
+						data = [
+							["Column Name"],
+							["Data Type"],
+							["Minimum Length"],
+							["Average Length"],
+							["Maximum Length"],
+							["Minimum Value"],
+							["Average Value"],
+							["Maximum Value"],
+							["Empty Values"],
+							["Distinct Values"],
+							["Total Values"]
+						]
+						if self.inputs["sketch"]: data += [["Median Length"], ["Median Value"], ["Frequent Values"]]
+						
+						for field in fields:
+							x = 0
 							
-							# Average Value
-							data[x].append(field["decimal-avg"]/j)
+							# Column Name
+							data[x].append(field["name"])
 							x += 1
 							
-							# Maximum Value
-							data[x].append(field["decimal-max"])
-							x += 1
-						elif field["date"]:
-							# Minimum Value
-							data[x].append(field["date-min"])
+							# Data Type
+							if field["boolean"]:
+								data[x].append("Boolean")
+							elif field["integer"]:
+								data[x].append("Integer")
+							elif field["decimal"]:
+								data[x].append("Decimal")
+							elif field["date"]:
+								data[x].append("Date")
+							elif field["time"]:
+								data[x].append("Time")
+							elif field["datetime"]:
+								data[x].append("Date/Time")
+							else:
+								data[x].append("Text")
 							x += 1
 							
-							# Average Value
-							data[x].append("")
+							# Minimum Length
+							data[x].append(field["length-min"])
 							x += 1
 							
-							# Maximum Value
-							data[x].append(field["date-max"])
-							x += 1
-						elif field["time"]:
-							# Minimum Value
-							data[x].append(field["time-min"])
+							# Average Length
+							data[x].append(0 if (j - field["empty"] - field["null"]) == 0 else round(field["length-avg"]/(j - field["empty"] - field["null"]), 1))
 							x += 1
 							
-							# Average Value
-							data[x].append("")
+							# Maximum Length
+							data[x].append(field["length-max"])
 							x += 1
 							
-							# Maximum Value
-							data[x].append(field["time-max"])
-							x += 1
-						elif field["datetime"]:
-							# Minimum Value
-							data[x].append(field["datetime-min"])
-							x += 1
+							if field["integer"]:
+								# Minimum Value
+								data[x].append(field["integer-min"])
+								x += 1
+								
+								# Average Value
+								data[x].append("" if (j - field["empty"] - field["null"]) == 0 else round(field["integer-avg"]/(j - field["empty"] - field["null"]), 1))
+								x += 1
+								
+								# Maximum Value
+								data[x].append(field["integer-max"])
+								x += 1
+							elif field["decimal"]:
+								# Minimum Value
+								data[x].append(field["decimal-min"])
+								x += 1
+								
+								# Average Value
+								data[x].append(field["decimal-avg"]/j)
+								x += 1
+								
+								# Maximum Value
+								data[x].append(field["decimal-max"])
+								x += 1
+							elif field["date"]:
+								# Minimum Value
+								data[x].append(field["date-min"])
+								x += 1
+								
+								# Average Value
+								data[x].append("")
+								x += 1
+								
+								# Maximum Value
+								data[x].append(field["date-max"])
+								x += 1
+							elif field["time"]:
+								# Minimum Value
+								data[x].append(field["time-min"])
+								x += 1
+								
+								# Average Value
+								data[x].append("")
+								x += 1
+								
+								# Maximum Value
+								data[x].append(field["time-max"])
+								x += 1
+							elif field["datetime"]:
+								# Minimum Value
+								data[x].append(field["datetime-min"])
+								x += 1
+								
+								# Average Value
+								data[x].append("")
+								x += 1
+								
+								# Maximum Value
+								data[x].append(field["datetime-max"])
+								x += 1
+							else:
+								# Minimum Value
+								data[x].append(field["text-min"])
+								x += 1
+								
+								# Average Value
+								data[x].append("")
+								x += 1
+								
+								# Maximum Value
+								data[x].append(field["text-max"])
+								x += 1
 							
-							# Average Value
-							data[x].append("")
+							# Empty Values
+							data[x].append(field["empty"] + field["null"])
 							x += 1
 							
-							# Maximum Value
-							data[x].append(field["datetime-max"])
-							x += 1
-						else:
-							# Minimum Value
-							data[x].append(field["text-min"])
+							# Distinct Values
+							distinct = len(field["values"]) if "sketch" not in field else field["sketch"]["distinct"].count()
+							data[x].append(distinct + int(field["empty"] > 0) + int(field["null"] > 0))
 							x += 1
 							
-							# Average Value
-							data[x].append("")
+							# Total Values
+							data[x].append(j)
 							x += 1
 							
-							# Maximum Value
-							data[x].append(field["text-max"])
-							x += 1
-						
-						# Empty Values
-						data[x].append(field["empty"] + field["null"])
-						x += 1
+							if "sketch" in field:
+								sketch = field["sketch"]
+								
+								# Median Length
+								data[x].append("" if sketch["lengths"].count == 0 else sketch["lengths"].quantile(0.5))
+								x += 1
+								
+								# Median Value
+								if (field["integer"] or field["decimal"]) and (sketch["numbers"].count > 0):
+									median = sketch["numbers"].quantile(0.5)
+									data[x].append(int(median) if field["integer"] else median)
+								else:
+									data[x].append("")
+								x += 1
+								
+								# Frequent Values
+								data[x].append("; ".join("{} ({})".format(value, count) for (value, count) in sketch["frequent"].top(5)))
+								x += 1
 						
-						# Distinct Values
-						data[x].append(len(field["values"]) + int(field["empty"] > 0) + int(field["null"] > 0))
-						x += 1
+						for record in data: results += self.unparse_data(record, self.inputs["delim"], self.inputs["enclose"], self.inputs["escape"]) + "\n"
 						
-						# Total Values
-						data[x].append(j)
-						x += 1
-					
-					for record in data: results += self.unparse_data(record, self.inputs["delim"], self.inputs["enclose"], self.inputs["escape"]) + "\n"
-					
-				elif self.inputs["action"] == "sql-import":
-					# Get table name from filename
-					table_name = "tbl"
-					if input_filename != "STDIN":
-						table_name = name.strip().lower()
-						table_name = re.sub("[ -]+", "_", table_name)
-						table_name = re.sub("[^A-Za-z0-9_]+", "", table_name)
-					
-					# Integer storage bits
-					integer_storage_bits = {"TINYINT":8, "SMALLINT":16, "MEDIUMINT":24, "INT":32, "BIGINT":64}
-					
-					# Create column definitions
-					columns = []
-					for field in fields:
-						column_name = field["name"].strip().lower()
-						column_name = re.sub("[ -]+", "_", column_name)
-						column_name = re.sub("[^A-Za-z0-9_]+", "", column_name)
+					elif self.inputs["action"] == "sql-import":
+						# Get table name from filename
+						table_name = "tbl"
+						if input_filename != "STDIN":
+							table_name = name.strip().lower()
+							table_name = re.sub("[ -]+", "_", table_name)
+							table_name = re.sub("[^A-Za-z0-9_]+", "", table_name)
 						
-						null = "NULL" if field["null"] > 0 else "NOT NULL"
+						# Integer storage bits
+						integer_storage_bits = {"TINYINT":8, "SMALLINT":16, "MEDIUMINT":24, "INT":32, "BIGINT":64}
 						
-						datatype = None
-						if (field["boolean"]) and (sorted(list(field["values"].keys())) in [["0"], ["1"], ["0", "1"]]):
-							datatype = "TINYINT UNSIGNED"
-						elif (field["date"]) and (field["date-format"] == "%Y-%m-%d"):
-							datatype = "DATE"
-						elif (field["datetime"]) and ((field["datetime-format"] == "%Y-%m-%d %H:%M") or (field["datetime-format"] == "%Y-%m-%d %H:%M:%S")):
-							datatype = "DATETIME"
-						elif (field["time"]) and ((field["time-format"] == "%H:%M") or (field["time-format"] == "%H:%M:%S")):
-							datatype = "TIME"
-						elif (field["length-min"] > 0) and (field["length-min"] == field["length-max"]):
-							datatype = "CHAR({})".format(field["length-min"])
-						elif field["integer"]:
-							for inttype in integer_storage_bits:
-								bits = integer_storage_bits[inttype]
-								extra = ""
-								minval = None
-								maxval = None
-								if field["integer-min"] < 0:
-									minval = (-2)**(bits - 1)
-									maxval = (2**(bits - 1)) - 1
+						# Create column definitions
+						columns = []
+						for field in fields:
+							column_name = field["name"].strip().lower()
+							column_name = re.sub("[ -]+", "_", column_name)
+							column_name = re.sub("[^A-Za-z0-9_]+", "", column_name)
+							
+							null = "NULL" if field["null"] > 0 else "NOT NULL"
+							
+							datatype = None
+							if (field["boolean"]) and (sorted(list(field["values"].keys())) in [["0"], ["1"], ["0", "1"]]):
+								datatype = "TINYINT UNSIGNED"
+							elif (field["date"]) and (field["date-format"] == "%Y-%m-%d"):
+								datatype = "DATE"
+							elif (field["datetime"]) and ((field["datetime-format"] == "%Y-%m-%d %H:%M") or (field["datetime-format"] == "%Y-%m-%d %H:%M:%S")):
+								datatype = "DATETIME"
+							elif (field["time"]) and ((field["time-format"] == "%H:%M") or (field["time-format"] == "%H:%M:%S")):
+								datatype = "TIME"
+							elif (field["length-min"] > 0) and (field["length-min"] == field["length-max"]):
+								datatype = "CHAR({})".format(field["length-min"])
+							elif field["integer"]:
+								for inttype in integer_storage_bits:
+									bits = integer_storage_bits[inttype]
+									extra = ""
+									minval = None
+									maxval = None
+									if field["integer-min"] < 0:
+										minval = (-2)**(bits - 1)
+										maxval = (2**(bits - 1)) - 1
+									else:
+										extra = " UNSIGNED"
+										minval = 0
+										maxval = (2**bits) - 1
+									if (field["integer-min"] >= minval) and (field["integer-max"] <= maxval):
+										datatype = inttype + extra
+										break
+							elif field["decimal"]:
+								datatype = "DECIMAL"
+							
+							if datatype is None:
+								length = field["length-max"]
+								if length > 1024:
+									datatype = "TEXT"
 								else:
-									extra = " UNSIGNED"
-									minval = 0
-									maxval = (2**bits) - 1
-								if (field["integer-min"] >= minval) and (field["integer-max"] <= maxval):
-									datatype = inttype + extra
-									break
-						elif field["decimal"]:
-							datatype = "DECIMAL"
-						
-						if datatype is None:
-							length = field["length-max"]
-							if length > 1024:
-								datatype = "TEXT"
-							else:
-								if length <= 10: length = 10
-								elif length <= 25: length = 25
-								elif length <= 50: length = 50
-								elif length <= 100: length = 100
-								elif length <= 255: length = 255
-								else: length = 1024
-								datatype = "VARCHAR({})".format(length)
-						
-						columns.append("\t`{}` {} {}".format(column_name, datatype, null))
-						
-					# Create full SQL
-					def escape(s):
-						s = s.replace("\\", "\\\\")
-						s = s.replace("'", "\\'")
-						s = s.replace("\t", "\\t")
-						s = s.replace("\r", "\\r")
-						s = s.replace("\n", "\\n")
-						return s
-					parts = [table_name, ",\n".join(columns), escape(os.path.abspath(input_filename)), table_name, escape(self.inputs["delim"]), escape(self.inputs["enclose"]), escape(linesep or os.linesep), " IGNORE 1 LINES" if self.inputs["headers"] else ""]
-					results = "CREATE TABLE {}(\n{}\n);\n\nLOAD DATA INFILE '{}' IGNORE INTO TABLE {} FIELDS TERMINATED BY '{}' OPTIONALLY ENCLOSED BY '{}' LINES TERMINATED BY '{}'{};\n".format(*parts)
+									if length <= 10: length = 10
+									elif length <= 25: length = 25
+									elif length <= 50: length = 50
+									elif length <= 100: length = 100
+									elif length <= 255: length = 255
+									else: length = 1024
+									datatype = "VARCHAR({})".format(length)
+							
+							columns.append("\t`{}` {} {}".format(column_name, datatype, null))
+							
+						# Create full SQL
+						def escape(s):
+							s = s.replace("\\", "\\\\")
+							s = s.replace("'", "\\'")
+							s = s.replace("\t", "\\t")
+							s = s.replace("\r", "\\r")
+							s = s.replace("\n", "\\n")
+							return s
+						parts = [table_name, ",\n".join(columns), escape(os.path.abspath(input_filename)), table_name, escape(self.inputs["delim"]), escape(self.inputs["enclose"]), escape(linesep or os.linesep), " IGNORE 1 LINES" if self.inputs["headers"] else ""]
+						results = "CREATE TABLE {}(\n{}\n);\n\nLOAD DATA INFILE '{}' IGNORE INTO TABLE {} FIELDS TERMINATED BY '{}' OPTIONALLY ENCLOSED BY '{}' LINES TERMINATED BY '{}'{};\n".format(*parts)
+					else:
+						raise ValueError("Unknown action: {}".format(self.inputs["action"]))
 				else:
-					raise ValueError("Unknown action: {}".format(self.inputs["action"]))
+					results = "No data found."
+				
+				# Output the results
+				mode = "w"
+				f_out = self.open(output_filename, mode, self.inputs["encoding"])
+				try:
+					f_out.write(results)					
+				finally:
+					if f_out != sys.stdout: f_out.close()
+				
+				f += 1
+		finally:
+			if pool is not None: pool.shutdown()
+		
+		return i
+
+	def analyze_chunks(self, pool, filename, start, columns):
+		"""Analyze a file from the given byte offset to the end in worker processes.
+		
+		Yields the field information, number of records and ending byte offset of each chunk in order.
+		"""
+		
+		# Keep a limited number of chunks in progress
+		inputs = dict(self.inputs)
+		pending = deque()
+		chunks = self.chunks(filename, start)
+		while (len(chunks) > 0) or (len(pending) > 0):
+			while (len(chunks) > 0) and (len(pending) < self.inputs["jobs"] * 2):
+				(chunk_start, chunk_end) = chunks.pop(0)
+				pending.append((chunk_end, pool.submit(AnalyzeAction.analyze_chunk, inputs, filename, chunk_start, chunk_end, columns)))
+			
+			(chunk_end, future) = pending.popleft()
+			(fields, count) = future.result()
+			yield (fields, count, chunk_end)
+	
+	@staticmethod
+	def analyze_chunk(inputs, filename, start, end, columns):
+		"""Analyze a byte range of a file in a worker process and return the field information and number of records."""
+		return AnalyzeAction(inputs).analyze_range(filename, start, end, columns)
+	
+	def analyze_range(self, filename, start, end, columns):
+		"""Analyze the records in a byte range of a file and return the field information and number of records."""
+		
+		with open(filename, mode="rb") as f:
+			f.seek(start)
+			data = f.read(end - start)
+		
+		classifier = TypeClassifier()
+		fields = [ColumnStats("field-{}".format(k), chunk=True) for k in range(columns)]
+		batch = []
+		j = 0
+		for line in DataReader(io.StringIO(data.decode(self.inputs["encoding"]), newline="")):
+			record = self.parse(line)
+			if self.inputs["engine"] != "numpy":
+				for k in range(len(record)): fields[k].add(record[k], classifier)
 			else:
-				results = "No data found."
+				batch.append(record)
+				if len(batch) >= self.batch_size:
+					self.add_batch(fields, batch, classifier)
+					batch = []
+			j += 1
+		
+		if batch: self.add_batch(fields, batch, classifier)
+		
+		return (fields, j)
+	
+	def add_batch(self, fields, records, classifier):
+		"""Add a batch of records to the field information a column at a time."""
+		
+		widths = set(map(len, records))
+		if widths == {len(fields)}:
+			columns = list(zip(*records))
+		else:
+			columns = [[record[k] for record in records if len(record) > k] for k in range(max(widths))]
+		
+		for k in range(len(columns)): fields[k].add_batch(list(columns[k]), classifier)
+	
+	def load_profile(self, filename):
+		"""Return the saved profile of a file with its field information, or None if there isn't one or the file has changed other than by appending to it."""
+		
+		try:
+			with open(filename + self.profile_extension, mode="r", encoding="utf-8") as f: profile = json.load(f)
 			
-			# Output the results
-			mode = "w"
-			f_out = self.open(output_filename, mode, self.inputs["encoding"])
-			try:
-				f_out.write(results)					
-			finally:
-				if f_out != sys.stdout: f_out.close()
+			if profile["options"] != {key:self.inputs[key] for key in self.profile_options}: return None
 			
-			f += 1
+			with open(filename, mode="rb") as f:
+				# The analyzed part must be unchanged, and can't have ended partway through a line that has since been continued
+				offset = profile["offset"]
+				size = os.fstat(f.fileno()).st_size
+				if (size < offset) or (self.fingerprint(f, offset) != profile["fingerprint"]): return None
+				if (offset > 0) and (size > offset):
+					f.seek(offset - 1)
+					if f.read(1) not in [b"\n", b"\r"]: return None
+			
+			profile["fields"] = [ColumnStats.load(field) for field in profile["fields"]]
+		except (OSError, ValueError, KeyError, TypeError) as e:
+			return None
+		
+		return profile
+	
+	def save_profile(self, filename, fields, records, offset, linesep):
+		"""Save the field information for the first offset bytes of a file next to it."""
+		
+		with open(filename, mode="rb") as f: fingerprint = self.fingerprint(f, offset)
+		
+		profile = {
+			"options"    :{key:self.inputs[key] for key in self.profile_options},
+			"offset"     :offset,
+			"fingerprint":fingerprint,
+			"records"    :records,
+			"linesep"    :linesep,
+			"fields"     :[field.dump() for field in fields]
+		}
+		
+		# Replace the old profile only once the new one is complete
+		temp_filename = filename + self.profile_extension + ".tmp"
+		with open(temp_filename, mode="w", encoding="utf-8") as f: json.dump(profile, f)
+		os.replace(temp_filename, filename + self.profile_extension)
+	
+	def fingerprint(self, f, offset):
+		"""Return a hash of the start of a binary file and the bytes before the given offset."""
 		
-		return "Processed {} records sucessfully".format(i)
+		digest = hashlib.sha256()
+		for start in [0, max(offset - self.fingerprint_size, 0)]:
+			f.seek(start)
+			digest.update(f.read(min(offset, self.fingerprint_size)))
+		
+		return digest.hexdigest()
 
 class BasicAction(Action):
 	"""Class to perform basic actions."""
 	
-	def action(self):
-		"""Perform the task and return a message for the user."""
+	# Actions that process each record independently and can be split across processes
+	record_local = ["filter", "remove-columns", "repair", "replace-pattern", "replace-value", "sql-prepare"]
+	
+	# Key files with more values than this are loaded into a Bloom filter instead of a set
+	key_limit = 10 * 1000 * 1000
+	
+	# Number of files combine reads ahead of time
+	prefetch_files = 8
+	
+	# The keys a worker process loaded for each file, with the file's signature, so they're only loaded once for all of its chunks, they're
+	# freed when the pool is shut down
+	worker_keys = {}
+	
+	# Options each stage of a pipeline sets for itself with their defaults, the rest are the same for every stage
+	stage_options = {"column":"", "columns":"", "find":"", "replace":"", "invert":False, "keys":"", "pattern":""}
+	
+	# Currency symbols removed by sql-prepare
+	currency_symbols = ["$", "¢", "$b", "$U", "£", "¥", "฿", "₡", "₦", "₩", "₪", "₫", "€", "₭", "₮", "₱", "₴", "₹", "₺", "₼", "₽", "₨", "B/.", "Br", "Bs", "BZ$", "C$", "CHF", "Ft", "ƒ", "Gs", "J$", "Kč", "KM", "kn", "kr", "L", "lei", "Lek", "MT", "NT$", "P", "Q", "R", "R$", "RD$", "RM", "Rp", "S", "S/.", "TT$", "Z$", "zł", "ден", "Дин.", "лв"]
+	
+	def process_files(self):
+		"""Process the input files and return the number of records processed."""
 		
 		total_bytes = 0
 		for filename in self.inputs["input"]: total_bytes += 0 if filename == "STDIN" else os.path.getsize(filename)
 		
-		currency_symbols = ["$", "¢", "$b", "$U", "£", "¥", "฿", "₡", "₦", "₩", "₪", "₫", "€", "₭", "₮", "₱", "₴", "₹", "₺", "₼", "₽", "₨", "B/.", "Br", "Bs", "BZ$", "C$", "CHF", "Ft", "ƒ", "Gs", "J$", "Kč", "KM", "kn", "kr", "L", "lei", "Lek", "MT", "NT$", "P", "Q", "R", "R$", "RD$", "RM", "Rp", "S", "S/.", "TT$", "Z$", "zł", "ден", "Дин.", "лв"]
+		# Start the worker processes if needed
+		pool = None
+		if (self.inputs["jobs"] > 1) and (self.inputs["action"] in self.record_local): pool = ProcessPoolExecutor(self.inputs["jobs"])
+		
+		self.initialize()
+		
+		# Read the files being combined ahead of time so they can be copied as they are
+		contents = None
+		self.copied = None
+		if (self.inputs["action"] == "combine") and (len(self.stages) == 1) and ("STDIN" not in self.inputs["input"]) and self.copyable(): contents = self.prefetch(self.inputs["input"])
 		
 		# Loop over input files
 		b = i = f = 0
 		started = time.time()
-		for input_filename in self.inputs["input"]:
-			# Get/format output filename
-			(name, ext) = os.path.splitext(os.path.basename(input_filename))
-			output_filename = self.inputs["output"].format(f=name, e=ext)
-			
-			# Open the input file
-			f_in = self.open(input_filename, "r", self.inputs["encoding"])
-			try:
-				# Open the output file
+		timer = ProgressTimer(self.inputs["progress-interval"])
+		try:
+			for input_filename in self.inputs["input"]:
+				# Get/format output filename
+				(name, ext) = os.path.splitext(os.path.basename(input_filename))
+				output_filename = self.inputs["output"].format(f=name, e=ext)
 				in_place = (os.path.normcase(os.path.normpath(input_filename)) == os.path.normcase(os.path.normpath(output_filename)))
 				inidvidual_outputs = (self.inputs["output"] != output_filename)
 				mode = "w" if (f == 0) or inidvidual_outputs else "a"
-				f_out = self.open(output_filename + (".tmp" if in_place else ""), mode, self.inputs["encoding"])
+				
+				# Copy the records of files being combined when possible
+				if contents is not None:
+					data = next(contents)
+					count = None if in_place else self.combine_bytes(input_filename, data, output_filename, mode, self.inputs["headers"] and (f > 0) and (not inidvidual_outputs))
+					if count is not None:
+						b += os.path.getsize(input_filename)
+						i += count
+						f += 1
+						
+						if timer.due(): self.progress("Record: {}".format(i), started, b, total_bytes)
+						continue
+					
+					self.close_copied()
+				
+				# Learn new conversion plans for each file
+				for stage in self.stages: (stage.plans, stage.learning) = ([] if self.inputs["plan"] else None, True)
+				
+				# Open the input file
+				f_in = self.open(input_filename, "r", self.inputs["encoding"])
+				reader = None
 				try:
-					# Process the file
-					headers = self.inputs["headers"]
-					j = 0
-					reader = DataReader(f_in)
-					for line in reader:
-						b += len(line.encode(self.inputs["encoding"])) + len(reader.linesep)
+					# Open the output file
+					f_out = self.open(output_filename + (".tmp" if in_place else ""), mode, self.inputs["encoding"])
+					try:
+						# Process the file
+						headers = self.inputs["headers"]
+						j = 0
+						reader = self.reader(f_in) if self.inputs["action"] != "tail" else self.tail(f_in, input_filename)
 						
-						# Skip the header row on all files except the first one, unless each file gets its own output
-						if (f == 0) or (not headers) or inidvidual_outputs:
-							record = None
-							if self.inputs["action"] not in ["combine", "head"]:
-								# Parse the data
-								record = self.parse_data(line, self.inputs["delim"], self.inputs["enclose"], self.inputs["escape"])
-							
-								# Column error checking
-								columns = []
-								if isinstance(self.inputs["columns"], list): columns = self.inputs["columns"]
-								if isinstance(self.inputs["column"], int): columns.append(self.inputs["column"])
-								for c in columns:
-									if c > len(record):
-										raise ValueError("Column #{} does not exist on line {} of '{}'".format(c+1, j+1, input_filename))
+						# Only split regular files larger than a chunk whose byte offsets can be found
+						parallel = (pool is not None) and (input_filename != "STDIN") and (reader.raw is not None) and (os.path.getsize(input_filename) > self.chunk_size)
+						
+						for line in reader:
 							
-							# Process the record
-							record_changed = False
-							if self.inputs["action"] == "combine":
-								pass
-							elif self.inputs["action"] == "filter":
-								if not headers:
-									match = re.search(self.inputs["pattern"], record[self.inputs["column"]])
-									if not((match and not self.inputs["invert"]) or (not match and self.inputs["invert"])): line = None
-							elif self.inputs["action"] == "head":
-								if (j+1) > self.inputs["lines"]: break
-							elif self.inputs["action"] == "remove-columns":
-								if self.inputs["invert"]:
-									self.inputs["columns"] = list(set(range(len(record))) - set(self.inputs["columns"]))
-									self.inputs["columns"].sort(reverse=True)
-									self.inputs["invert"] = False
-								for k in self.inputs["columns"]: del record[k]
-								record_changed = True
-							elif self.inputs["action"] == "repair":
-								record_changed = True
-							elif self.inputs["action"] == "replace-pattern":
-								if not headers: record[self.inputs["column"]] = re.sub(self.inputs["find"], self.inputs["replace"], record[self.inputs["column"]])
-								record_changed = True
-							elif self.inputs["action"] == "replace-value":
-								if not headers: record[self.inputs["column"]] = record[self.inputs["column"]].replace(self.inputs["find"], self.inputs["replace"])
-								record_changed = True
+							# Skip the header row on all files except the first one, unless each file gets its own output
+							if (f == 0) or (not headers) or inidvidual_outputs:
+								if (self.inputs["action"] == "head") and ((j+1) > self.inputs["lines"]): break
+								
+								# Process and output the line
+								line = self.process(line, headers, j, input_filename)
+								if line is not None: f_out.write(line + "\n")
 								
-							elif self.inputs["action"] == "sql-prepare":
 								if not headers:
-									j = 0
-									while j < len(record):
-										val = record[j]
-										if val == "":
-											val = "\\N"
-										elif re.search(r"\d+", val):
-											num = val
-											
-											# Remove currency symbols and number formatting
-											for c in currency_symbols: num = num.replace(c, "")
-											num = num.replace("%", "")
-											num = num.replace(",", "")
-											num = num.replace(" ", "")
-											
-											# Convert negative notation from (###) to -###
-											if (num[0] == "(") and (num[-1] == ")"): num = "-" + num[1:-1]
-											
-											# Attempt to parse as a number
-											try:
-												val = int(num)
-											except ValueError:
-												try:
-													val = float(num)
-												except ValueError:
-													# Attempt to parse as a date or time
-													dt = dateparser.parse(val, settings={'STRICT_PARSING': True})
-													if dt is not None:
-														if (dt.hour == 0) and (dt.minute == 0) and (dt.second == 0):
-															val = dt.strftime("%Y-%m-%d")
-														else:
-															val = dt.strftime("%Y-%m-%d %H:%M:%S")
-													elif re.search(r"^\d{1,2}:\d{2}(:\d{2})?$", val) or re.search(r"^\d{1,2}(:\d{2})?(:\d{2})? ?(AM|PM)$", val, re.IGNORECASE):
-														dt = dateparser.parse(val, settings={'STRICT_PARSING': False})
-														if dt is not None: val = dt.strftime("%H:%M:%S")
-										
-										if record[j] != val: record[j] = val
-										j+=1
-										
-								record_changed = True
-							else:
-								raise ValueError("Unknown action: {}".format(self.inputs["action"]))
+									j += 1
+									i += 1
+									
+									# Conversion plans are learned from the first records of each file, whether or not the rest is processed in parallel
+									if self.inputs["plan"] and (j == ConversionPlan.sample_size): self.decide_plans()
 							
-							# Update the line if needed
-							if record_changed: line = self.unparse_data(record, self.inputs["delim"], self.inputs["enclose"], self.inputs["escape"])
+							if headers: headers = False
 							
-							# Output the line
-							if line is not None: f_out.write(line + "\n")
+							# Process the rest of the file in parallel once the first line is done, and the conversion plans are learned
+							if parallel and ((not self.inputs["plan"]) or (j >= ConversionPlan.sample_size)):
+								for (output, count, end) in self.process_chunks(pool, input_filename, reader.bytes, j):
+									f_out.write(output)
+									j += count
+									i += count
+									
+									if timer.due(): self.progress("Record: {}".format(i), started, b + end, total_bytes)
+								break
 							
-							if not headers:
-								j += 1
-								i += 1
-						
-						if headers: headers = False
+							if timer.due():
+								if self.inputs["action"] == "head":
+									self.progress("Record: {}".format(i), started, i, self.inputs["lines"] * len(self.inputs["input"]))
+								else:
+									self.progress("Record: {}".format(i), started, b + reader.bytes, total_bytes)
 						
-						if self.inputs["action"] == "head":
-							self.progress("Record: {}".format(i), started, i, self.inputs["lines"] * len(self.inputs["input"]))
-						else:
-							self.progress("Record: {}".format(i), started, b, total_bytes)
+						b += os.path.getsize(input_filename) if parallel else reader.bytes
+					finally:
+						if f_out != sys.stdout: f_out.close()
 				finally:
-					if f_out != sys.stdout: f_out.close()
-			finally:
-				if f_in != sys.stdin: f_in.close()
-				if in_place: shutil.move("{}.tmp".format(output_filename), output_filename)
-				
-			f += 1
+					# Release any memory map before an in-place output replaces the file
+					if reader is not None: reader.close()
+					if f_in != sys.stdin: f_in.close()
+					if in_place: shutil.move("{}.tmp".format(output_filename), output_filename)
+					
+				f += 1
+		finally:
+			if pool is not None: pool.shutdown()
+			self.close_copied()
+		
+		for stage in self.stages:
+			if (stage.cache is not None) and (self.inputs["cache-file"] != ""): stage.cache.save(self.inputs["cache-file"], self.timeless)
+		
+		return i
+	
+	def tail(self, f_in, filename):
+		"""Return a DataReader of the header, if there is one, and the last lines of a file.
+		
+		Regular files are read backwards from the end until there are enough lines, anything else is read to the end keeping the last lines.
+		"""
+		
+		lines = self.inputs["lines"]
+		reader = DataReader(f_in, 64 * 1024)
+		header = next(reader, None) if self.inputs["headers"] else None
+		
+		if (filename == "STDIN") or (reader.raw is None) or (not f_in.seekable()):
+			last = deque(reader, maxlen=lines)
+		else:
+			# Read blocks of twice the size each time until the lines after the first, which may be partial, are enough
+			floor = reader.bytes
+			position = os.path.getsize(filename)
+			data = b""
+			size = 64 * 1024
+			while position > floor:
+				n = min(size, position - floor)
+				position -= n
+				reader.raw.seek(position)
+				data = reader.raw.read(n) + data
+				size *= 2
+				
+				parts = DataReader.separators[bytes].split(data)
+				if (position > floor) and (sum(1 for line in parts[2::2] if line != b"") >= lines):
+					data = data[len(parts[0]) + len(parts[1]):]
+					break
+			
+			last = deque(DataReader(io.StringIO(data.decode(reader.encoding, reader.errors), newline="")), maxlen=lines)
+		
+		lines = ([header] if header is not None else []) + list(last)
+		return DataReader(io.StringIO("".join(line + "\n" for line in lines), newline=""))
+	
+	def prefetch(self, filenames):
+		"""Yield the contents of each file, read ahead of time by a pool of threads, or None for files larger than a block."""
+		
+		def read(filename):
+			if os.path.getsize(filename) > DataReader.block_size: return None
+			with open(filename, mode="rb") as f: return f.read()
+		
+		with ThreadPoolExecutor(self.prefetch_files) as pool:
+			pending = deque()
+			for filename in filenames:
+				pending.append(pool.submit(read, filename))
+				if len(pending) >= self.prefetch_files: yield pending.popleft().result()
+			while len(pending) > 0: yield pending.popleft().result()
+	
+	def combine_bytes(self, filename, data, output_filename, mode, skip_header):
+		"""Write a file's lines to the output file as they are, without the header if skip_header is set, and return the number of records, or None if it can't be copied as is.
+		
+		Data is the contents of the file, or None to copy it from the file. Only files without \\r and blank lines are copied, see SplitAction.split_bytes.
+		"""
+		
+		# Check every line and count them
+		if data is not None:
+			if (b"\r" in data) or (b"\n\n" in b"\n" + data): return None
+			(newlines, last, size) = (data.count(b"\n"), data[-1:], len(data))
+			header = data[:data.find(b"\n") + 1] or data
+		else:
+			(newlines, last, size) = (0, b"\n", 0)
+			with open(filename, mode="rb") as f_in:
+				for block in iter(lambda: f_in.read(DataReader.block_size), b""):
+					if (b"\r" in block) or (b"\n\n" in last + block): return None
+					newlines += block.count(b"\n")
+					last = block[-1:]
+					size += len(block)
+				f_in.seek(0)
+				header = f_in.readline()
+		
+		# The last line may not have a line ending
+		count = newlines + (1 if last not in [b"", b"\n"] else 0)
+		start = 0
+		if self.inputs["headers"]:
+			if size > 0: count -= 1
+			if skip_header: start = len(header)
+		
+		# Keep the output file open while files are copied to it
+		if (self.copied is not None) and ((self.copied[0] != output_filename) or (mode == "w")): self.close_copied()
+		if self.copied is None: self.copied = (output_filename, self.open(output_filename, mode, self.inputs["encoding"]))
+		f_out = self.copied[1]
+		
+		f_out.flush()
+		if data is not None:
+			f_out.buffer.write(data[start:])
+		else:
+			with open(filename, mode="rb") as f_in: self.copy_range(f_in, f_out.buffer, start, size)
+		if (last not in [b"", b"\n"]) and (size > start): f_out.buffer.write(b"\n")
+		
+		return count
+	
+	def close_copied(self):
+		"""Close the output file kept open while files are copied to it, if there is one."""
+		
+		if self.copied is not None:
+			if self.copied[1] != sys.stdout:
+				self.copied[1].close()
+			else:
+				self.copied[1].flush()
+		self.copied = None
+	
+	def initialize(self, loaded_keys=None):
+		"""Prepare the caches, keys, prefilter and pipeline stages used by process(), loaded_keys is shared with the other stages of the pipeline."""
+		
+		self.cache = self.value_cache()
+		self.classifier = TypeClassifier() if self.inputs["plan"] else None
+		self.plans = [] if self.inputs["plan"] else None
+		self.learning = True
+		self.loaded_keys = {} if loaded_keys is None else loaded_keys
+		self.keys = self.load_keys()
+		
+		# Filter out lines without a string every match must contain before parsing them, it can't include characters removed by parsing
+		self.prefilter = None
+		if (self.inputs["action"] == "filter") and (self.keys is None):
+			literal = self.required_literal(self.inputs["pattern"])
+			if (literal != "") and ((self.inputs["enclose"] == "") or (self.inputs["enclose"] not in literal)) and ((self.inputs["escape"] == "") or (self.inputs["escape"] not in literal)): self.prefilter = literal
+		
+		# This action is the first stage of its pipeline
+		self.stages = [self] + self.load_pipeline()
+	
+	@staticmethod
+	def required_literal(pattern):
+		"""Return the longest string that every match of a regular expression contains, or "" if there isn't one."""
+		
+		try:
+			parsed = sre_parse.parse(pattern)
+		except Exception as e:
+			return ""
+		
+		if parsed.state.flags & re.IGNORECASE: return ""
+		
+		# Find runs of literal characters outside of alternatives, repeats, character sets, etc.
+		literals = [""]
+		def find(items):
+			for (op, arg) in items:
+				if op == sre_parse.LITERAL:
+					literals[-1] += chr(arg)
+				elif (op == sre_parse.SUBPATTERN) and not (arg[1] & re.IGNORECASE):
+					find(arg[-1])
+				else:
+					literals.append("")
+		find(parsed)
+		
+		return max(literals, key=len)
+	
+	def value_cache(self):
+		"""Return a ValueCache for sql-prepare's values, loaded from the cache file if there is one, or None if values aren't cached."""
+		
+		if (self.inputs["action"] != "sql-prepare") or (self.inputs["cache"] == 0): return None
+		
+		cache = ValueCache(self.inputs["cache"], self.counters)
+		if self.inputs["cache-file"] != "": cache.load(self.inputs["cache-file"])
+		
+		return cache
+	
+	def load_keys(self):
+		"""Return the keys to filter with as a set, or a BloomFilter if there are too many, or None if not filtering with keys."""
+		
+		if (self.inputs["action"] != "filter") or (self.inputs["keys"] == ""): return None
+		
+		filename = os.path.abspath(self.inputs["keys"])
+		stat = os.stat(filename)
+		signature = (stat.st_size, stat.st_mtime_ns, self.inputs["encoding"], self.key_limit)
+		if (filename not in self.loaded_keys) or (self.loaded_keys[filename][0] != signature):
+			# Only count the lines if there could be too many
+			count = 0
+			if stat.st_size > self.key_limit:
+				with open(filename, mode="rb") as f:
+					for block in iter(lambda: f.read(DataReader.block_size), b""): count += block.count(b"\n")
+			
+			with self.open(filename, "r", self.inputs["encoding"]) as f:
+				# Lines of only whitespace aren't keys
+				if count > self.key_limit:
+					keys = BloomFilter(count)
+					for line in DataReader(f):
+						if not line.isspace(): keys.add(line.strip())
+				else:
+					keys = set(line.strip() for line in DataReader(f) if not line.isspace())
+			
+			self.loaded_keys[filename] = (signature, keys)
+		
+		return self.loaded_keys[filename][1]
+	
+	def load_pipeline(self):
+		"""Return an initialized action for each stage in the pipeline file, in order.
+		
+		Each line has an action followed by its options as on the command line, blank lines and lines starting with # are ignored.
+		"""
+		
+		if self.inputs["pipeline"] == "": return []
+		
+		filename = self.inputs["pipeline"]
+		stages = []
+		with self.open(filename, "r", self.inputs["encoding"]) as f:
+			for (n, line) in enumerate(DataReader(f)):
+				try:
+					# Split like a shell, without backslash escapes so patterns can be written as they are
+					lexer = shlex.shlex(line, posix=True)
+					lexer.whitespace_split = True
+					lexer.commenters = ""
+					lexer.escape = ""
+					tokens = list(lexer)
+					if (len(tokens) == 0) or tokens[0].startswith("#"): continue
+					
+					# Start each stage from this action's inputs without its action options
+					inputs = dict(self.inputs, input="STDIN", pipeline="", action=tokens[0], **self.stage_options)
+					options = iter(tokens[1:])
+					for option in options:
+						name = option[2:] if option.startswith("--") else None
+						if name not in self.stage_options: raise ValueError("Unknown option: {}".format(option))
+						inputs[name] = True if isinstance(self.stage_options[name], bool) else next(options, "")
+					
+					stage = BasicAction(inputs)
+					stage.standardize()
+					if stage.inputs["action"] not in self.record_local: raise ValueError("Pipelines can't include {}.".format(stage.inputs["action"]))
+					stage.validate()
+				except ValueError as e:
+					raise ValueError("Line {} of '{}': {}".format(n+1, filename, e))
+				
+				stage.counters = self.counters
+				stage.initialize(self.loaded_keys)
+				stages.append(stage)
+		
+		return stages
+	
+	def process(self, line, headers, j, input_filename):
+		"""Process a line with each stage of the pipeline and return the line to output, or None if it should be removed."""
+		
+		# Stages change the record left by the one before, so it's only parsed and unparsed once
+		record = None
+		for stage in self.stages:
+			(line, record) = stage.process_record(line, record, headers, j, input_filename)
+			if line is None: return None
+		
+		if record is not None: line = self.unparse_data(record, self.inputs["delim"], self.inputs["enclose"], self.inputs["escape"])
+		
+		return line
+	
+	def plain(self, line):
+		"""Return whether a line has no enclosure or escape characters, so every delimiter in it separates values."""
+		return ((self.inputs["enclose"] == "") or (self.inputs["enclose"] not in line)) and ((self.inputs["escape"] == "") or (self.inputs["escape"] not in line))
+	
+	def process_record(self, line, record, headers, j, input_filename):
+		"""Process a line, or the record an earlier stage changed it to, and return the line, or None if it should be removed, and the changed record, or None if the line is unchanged."""
+		
+		# Lines without the prefilter's string can't match, unless there are too few delimiters for the column to exist so it's an error,
+		# delimiters are only counted on lines without enclosures or escapes, where every one separates values
+		if (record is None) and (self.prefilter is not None) and (not headers) and (self.prefilter not in line) and self.plain(line) and (line.count(self.inputs["delim"]) >= self.inputs["column"]):
+			return (line if self.inputs["invert"] else None, None)
+		
+		changed = (record is not None)
+		if self.inputs["action"] not in ["combine", "head", "tail"]:
+			# Parse the data, filters output the line as is so only need the values up to the column
+			if not changed: record = self.parse(line, self.inputs["column"] + 1 if self.inputs["action"] == "filter" else None)
+			
+			# Column error checking
+			columns = []
+			if isinstance(self.inputs["columns"], list): columns = list(self.inputs["columns"])
+			if isinstance(self.inputs["column"], int): columns.append(self.inputs["column"])
+			for c in columns:
+				if c > len(record):
+					raise ValueError("Column #{} does not exist on line {} of '{}'".format(c+1, j+1, input_filename))
+		
+		# Process the record
+		record_changed = False
+		if self.inputs["action"] in ["combine", "head", "tail"]:
+			pass
+		elif self.inputs["action"] == "filter":
+			if not headers:
+				if self.keys is not None:
+					match = record[self.inputs["column"]] in self.keys
+				else:
+					match = re.search(self.inputs["pattern"], record[self.inputs["column"]])
+				if not((match and not self.inputs["invert"]) or (not match and self.inputs["invert"])): line = None
+		elif self.inputs["action"] == "remove-columns":
+			if self.inputs["invert"]:
+				self.inputs["columns"] = list(set(range(len(record))) - set(self.inputs["columns"]))
+				self.inputs["columns"].sort(reverse=True)
+				self.inputs["invert"] = False
+			for k in self.inputs["columns"]: del record[k]
+			record_changed = True
+		elif self.inputs["action"] == "repair":
+			record_changed = True
+		elif self.inputs["action"] == "replace-pattern":
+			if not headers: record[self.inputs["column"]] = re.sub(self.inputs["find"], self.inputs["replace"], record[self.inputs["column"]])
+			record_changed = True
+		elif self.inputs["action"] == "replace-value":
+			if not headers: record[self.inputs["column"]] = record[self.inputs["column"]].replace(self.inputs["find"], self.inputs["replace"])
+			record_changed = True
+		elif self.inputs["action"] == "sql-prepare":
+			if not headers:
+				for k in range(len(record)):
+					val = self.prepare_column(k, record[k])
+					if record[k] != val: record[k] = val
+			record_changed = True
+		else:
+			raise ValueError("Unknown action: {}".format(self.inputs["action"]))
+		
+		return (line, record if changed or record_changed else None)
+	
+	def prepare_column(self, k, val):
+		"""Standardize a value from column k for SQL LOAD DATA statements with the column's conversion plan and the cache, if enabled, and return it."""
+		
+		plan = None
+		if self.plans is not None:
+			while len(self.plans) <= k:
+				self.plans.append(ConversionPlan())
+				
+				# Columns that first appear after the plans are decided are converted the generic way
+				if not self.learning: self.plans[-1].decide()
+			plan = self.plans[k]
+			if plan.kind is not None:
+				converted = plan.convert(val, self.classifier)
+				if converted is not None: return converted
+		
+		converted = self.prepare_value(val) if self.cache is None else self.cache.get(val, self.prepare_value)
+		if (plan is not None) and (plan.kind is None): plan.learn(val, converted, self.classifier)
+		
+		return converted
+	
+	def decide_plans(self):
+		"""Decide the conversion plans of every stage from the records sampled so far, so the rest are converted the same way in one process or in chunks."""
+		for stage in self.stages:
+			stage.learning = False
+			if stage.plans is not None:
+				for plan in stage.plans: plan.decide()
+	
+	@staticmethod
+	def timeless(val, converted):
+		"""Return whether prepare_value converts a value the same way at any time, so the conversion can be saved for later runs.
 		
-		return "Processed {} records sucessfully".format(i)
+		Dates with words, i.e., "3 days ago", can be relative to the current time, dates of digits and punctuation never are.
+		"""
+		return isinstance(converted, (int, float)) or (converted == val) or (not any(c.isalpha() for c in val))
+	
+	def prepare_value(self, val):
+		"""Standardize the date/number formatting of a value for SQL LOAD DATA statements and return it."""
+		
+		if val == "":
+			val = "\\N"
+		elif re.search(r"\d+", val):
+			num = val
+			
+			# Remove currency symbols and number formatting
+			for c in self.currency_symbols: num = num.replace(c, "")
+			num = num.replace("%", "")
+			num = num.replace(",", "")
+			num = num.replace(" ", "")
+			
+			# Convert negative notation from (###) to -###
+			if (num[0] == "(") and (num[-1] == ")"): num = "-" + num[1:-1]
+			
+			# Attempt to parse as a number
+			try:
+				val = int(num)
+			except ValueError:
+				try:
+					val = float(num)
+				except ValueError:
+					# Attempt to parse as a date or time
+					dt = dateparser.parse(val, settings={'STRICT_PARSING': True})
+					if dt is not None:
+						if (dt.hour == 0) and (dt.minute == 0) and (dt.second == 0):
+							val = dt.strftime("%Y-%m-%d")
+						else:
+							val = dt.strftime("%Y-%m-%d %H:%M:%S")
+					elif re.search(r"^\d{1,2}:\d{2}(:\d{2})?$", val) or re.search(r"^\d{1,2}(:\d{2})?(:\d{2})? ?(AM|PM)$", val, re.IGNORECASE):
+						dt = dateparser.parse(val, settings={'STRICT_PARSING': False})
+						if dt is not None: val = dt.strftime("%H:%M:%S")
+		
+		return val
+	
+	def process_chunks(self, pool, filename, start, j):
+		"""Process a file from the given byte offset to the end in worker processes.
+		
+		Yields the output, number of records and ending byte offset of each chunk in order.
+		"""
+		
+		# Keep a limited number of chunks in progress
+		inputs = dict(self.inputs)
+		pending = deque()
+		chunks = self.chunks(filename, start)
+		while (len(chunks) > 0) or (len(pending) > 0):
+			while (len(chunks) > 0) and (len(pending) < self.inputs["jobs"] * 2):
+				(chunk_start, chunk_end) = chunks.pop(0)
+				pending.append((chunk_start, chunk_end, pool.submit(BasicAction.process_chunk, inputs, filename, chunk_start, chunk_end, [stage.plans for stage in self.stages])))
+			
+			(chunk_start, chunk_end, future) = pending.popleft()
+			try:
+				(output, count, counters) = future.result()
+				self.counters.update(counters)
+			except ValueError as e:
+				# Process the chunk again here so the error has the line number within the file
+				self.process_range(filename, chunk_start, chunk_end, j)
+				raise
+			
+			j += count
+			yield (output, count, chunk_end)
+	
+	@staticmethod
+	def process_chunk(inputs, filename, start, end, plans=None):
+		"""Process a byte range of a file in a worker process with the given conversion plans of each stage and return the output, number of records and the action's counters."""
+		action = BasicAction(inputs)
+		action.counters = Counter()
+		action.initialize(BasicAction.worker_keys)
+		for (stage, stage_plans) in zip(action.stages, plans or []): stage.plans = stage_plans
+		action.decide_plans()
+		return action.process_range(filename, start, end) + (action.counters,)
+	
+	def process_range(self, filename, start, end, j=0):
+		"""Process the lines in a byte range of a file and return the output and number of records."""
+		
+		with open(filename, mode="rb") as f:
+			f.seek(start)
+			data = f.read(end - start)
+		
+		output = []
+		first = j
+		for line in DataReader(io.StringIO(data.decode(self.inputs["encoding"]), newline="")):
+			line = self.process(line, False, j, filename)
+			if line is not None: output.append(line + "\n")
+			j += 1
+		
+		return ("".join(output), j - first)
 
 class FixedAction(Action):
 	"""Class to perform actions on fixed width files."""
 	
-	def action(self):
-		"""Perform the task and return a message for the user."""
+	# The numpy engine converts the columns of a batch of records at a time through a structured array laid out like the definition
+	engines = dict(Action.engines, numpy="parse_data_csv")
+	
+	# Number of records in each batch converted by the numpy engine
+	batch_size = 32 * 1024
+	
+	def process_files(self):
+		"""Process the input files and return the number of records processed."""
 		
 		total_bytes = 0
 		for filename in self.inputs["input"]: total_bytes += 0 if filename == "STDIN" else os.path.getsize(filename)
@@ -823,59 +1736,303 @@ class FixedAction(Action):
 				fixed_map.append(int(line))
 				fixed_length += int(line)
 		
+		# Lay out the records of the definition for the numpy engine, empty columns can't be laid out
+		layout = None
+		if (self.inputs["engine"] == "numpy") and (len(fixed_map) > 0) and (min(fixed_map) > 0):
+			layout = self.fixed_layout(fixed_map, self.inputs["action"] == "delim-to-fixed")
+		
+		# Records converted by fixed-to-delim, and whether they can be found by their byte offsets because every character is one byte
+		(first, last, offsets) = (0, None, False)
+		if self.inputs["action"] == "fixed-to-delim":
+			first = self.inputs["skip"]
+			if self.inputs["lines"] > 0: last = first + self.inputs["lines"]
+			offsets = (fixed_length > 0) and self.single_byte()
+		
+		# Start the worker processes if needed
+		pool = None
+		if (self.inputs["jobs"] > 1) and offsets: pool = ProcessPoolExecutor(self.inputs["jobs"])
+		
 		# Loop over input files
 		b = i = f = 0
 		started = time.time()
-		for input_filename in self.inputs["input"]:
-			# Get/format output filename
-			(name, ext) = os.path.splitext(os.path.basename(input_filename))
-			output_filename = self.inputs["output"].format(f=name, e=ext)
-			
-			# Open the input file
-			f_in = self.open(input_filename, "r", self.inputs["encoding"])
-			try:
-				# Open the output file
-				in_place = (os.path.normcase(os.path.normpath(input_filename)) == os.path.normcase(os.path.normpath(output_filename)))
-				inidvidual_outputs = (self.inputs["output"] != output_filename)
-				mode = "w" if (f == 0) or inidvidual_outputs else "a"
-				f_out = self.open(output_filename + (".tmp" if in_place else ""), mode, self.inputs["encoding"])
+		timer = ProgressTimer(self.inputs["progress-interval"])
+		try:
+			for input_filename in self.inputs["input"]:
+				# Get/format output filename
+				(name, ext) = os.path.splitext(os.path.basename(input_filename))
+				output_filename = self.inputs["output"].format(f=name, e=ext)
+				
+				# Open the input file
+				f_in = self.open(input_filename, "r", self.inputs["encoding"])
+				reader = None
 				try:
-					# Process the file
-					headers = self.inputs["headers"]
-					j = 0
-					reader = DataReader(f_in)
-					for line in reader:
-						b += len(line.encode(self.inputs["encoding"])) + len(reader.linesep)
-						
-						# Skip the header row on all files except the first one, unless each file gets its own output
-						if (f == 0) or (not headers) or inidvidual_outputs:
-							# Convert the data
-							if self.inputs["action"] == "delim-to-fixed":
-								record = self.parse_data(line, self.inputs["delim"], self.inputs["enclose"], self.inputs["escape"])
-								f_out.write(self.unparse_fixed(record, fixed_map, fixed_length) + "\n")
-							elif self.inputs["action"] == "fixed-to-delim":
-								record = self.parse_fixed(line, fixed_map, fixed_length, j)
-								f_out.write(self.unparse_data(record, self.inputs["delim"], self.inputs["enclose"], self.inputs["escape"]) + "\n")
-							else:
-								raise ValueError("Unknown action: {}".format(self.inputs["action"]))
+					# Open the output file
+					in_place = (os.path.normcase(os.path.normpath(input_filename)) == os.path.normcase(os.path.normpath(output_filename)))
+					inidvidual_outputs = (self.inputs["output"] != output_filename)
+					mode = "w" if (f == 0) or inidvidual_outputs else "a"
+					f_out = self.open(output_filename + (".tmp" if in_place else ""), mode, self.inputs["encoding"])
+					try:
+						# Process the file
+						headers = self.inputs["headers"]
+						j = 0
+						batch = None if layout is None else []
+						reader = self.reader(f_in)
+						seek = offsets and (input_filename != "STDIN") and (reader.raw is not None)
+						while reader is not None:
+							position = None
+							for line in reader:
+								# Stop after the last record converted
+								if (last is not None) and (not headers) and (j >= last): break
+								
+								# Skip the header row on all files except the first one, unless each file gets its own output
+								if (f == 0) or (not headers) or inidvidual_outputs:
+									# Convert the data, records after the header are converted in batches by the numpy engine
+									skipped = (not headers) and (j < first)
+									if skipped:
+										pass
+									elif (batch is not None) and (not headers):
+										batch.append(line)
+										if len(batch) >= self.batch_size:
+											f_out.write(self.convert_batch(batch, layout, fixed_map, fixed_length, j + 1 - len(batch)))
+											batch = []
+									elif self.inputs["action"] == "delim-to-fixed":
+										record = self.parse(line)
+										f_out.write(self.unparse_fixed(record, fixed_map, fixed_length) + "\n")
+									elif self.inputs["action"] == "fixed-to-delim":
+										record = self.parse_fixed(line, fixed_map, fixed_length, j)
+										f_out.write(self.unparse_data(record, self.inputs["delim"], self.inputs["enclose"], self.inputs["escape"]) + "\n")
+									else:
+										raise ValueError("Unknown action: {}".format(self.inputs["action"]))
+									
+									if not headers:
+										j += 1
+										if not skipped: i += 1
+								
+								if headers: headers = False
+								
+								# Find the rest of the records by their byte offsets once the first line shows the line separator
+								if seek and (reader.linesep != ""):
+									(position, linesep) = (reader.bytes, reader.linesep)
+									break
+								
+								if timer.due(): self.progress("Record: {}".format(i), started, b + reader.bytes, total_bytes)
 							
-							if not headers:
-								j += 1
-								i += 1
-						
-						if headers: headers = False
+							if batch:
+								f_out.write(self.convert_batch(batch, layout, fixed_map, fixed_length, j - len(batch)))
+								batch = []
+							
+							done = reader.bytes
+							reader.close()
+							reader = None
+							if position is not None:
+								seek = False
+								for (output, count, position) in self.convert_records(pool, input_filename, position, j, first, last, linesep, layout, fixed_map, fixed_length):
+									if output is not None:
+										f_out.write(output)
+										i += count
+									j += count
+									
+									if timer.due(): self.progress("Record: {}".format(i), started, b + position, total_bytes)
+								
+								# Read any lines left after them, i.e., a last line without a line separator or records that aren't laid out the same way
+								done = position
+								if (position < os.path.getsize(input_filename)) and ((last is None) or (j < last)):
+									f_in.close()
+									f_in = self.open(input_filename, "r", self.inputs["encoding"])
+									f_in.seek(position)
+									reader = self.reader(f_in)
 						
-						self.progress("Record: {}".format(i), started, b, total_bytes)
+						b += done
+					finally:
+						if f_out != sys.stdout: f_out.close()
 				finally:
-					if f_out != sys.stdout: f_out.close()
-			finally:
-				if f_in != sys.stdin: f_in.close()
-				if in_place: shutil.move("{}.tmp".format(output_filename), output_filename)
+					# Release any memory map before an in-place output replaces the file
+					if reader is not None: reader.close()
+					if f_in != sys.stdin: f_in.close()
+					if in_place: shutil.move("{}.tmp".format(output_filename), output_filename)
+					
+				f += 1
+		finally:
+			if pool is not None: pool.shutdown()
+		
+		return i
+	
+	def convert_records(self, pool, filename, start, j, first, last, linesep, layout, fixed_map, fixed_length):
+		"""Convert the fixed-length records of a file from the given byte offset, in ranges found by their byte offsets, in worker processes if there is a pool.
+		
+		Skipped records are passed over without being read. Yields the output (None for skipped records), number of records and ending
+		byte offset of each range in order, and stops at the first range whose records aren't each followed by the line separator.
+		"""
+		
+		width = fixed_length + len(linesep)
+		stop = j + ((os.path.getsize(filename) - start) // width)
+		
+		# Seek straight to the first record converted, as long as the skipped lines are that many records
+		target = min(first, stop)
+		if target > j:
+			offset = start + (target - j) * width
+			if not self.separated(filename, start, offset, target - j, linesep): return
+			
+			yield (None, target - j, offset)
+			(start, j) = (offset, target)
+		
+		if last is not None: stop = min(stop, last)
+		
+		# Keep a limited number of ranges in progress
+		inputs = dict(self.inputs)
+		pending = deque()
+		size = max(1, self.chunk_size // width)
+		ranges = [(start + (k - j) * width, k, min(size, stop - k)) for k in range(j, stop, size)]
+		while (len(ranges) > 0) or (len(pending) > 0):
+			while (len(ranges) > 0) and ((pool is None) or (len(pending) < self.inputs["jobs"] * 2)):
+				(range_start, k, count) = ranges.pop(0)
+				if pool is None:
+					pending.append((range_start, count, FixedAction.convert_range(inputs, filename, range_start, k, count, linesep, layout, fixed_map, fixed_length)))
+					break
+				pending.append((range_start, count, pool.submit(FixedAction.convert_range, inputs, filename, range_start, k, count, linesep, layout, fixed_map, fixed_length)))
+			
+			(range_start, count, output) = pending.popleft()
+			if pool is not None: output = output.result()
+			if output is None:
+				for (range_start, count, future) in pending: future.cancel()
+				return
+			
+			yield (output, count, range_start + count * width)
+	
+	def separated(self, filename, start, end, count, linesep):
+		"""Return whether a byte range of a file is count lines that each end with the line separator, without blank lines or other line breaks.
+		
+		The lines are counted without being decoded, so skipped records of other lengths can't shift the ones that are converted.
+		"""
+		
+		separator = linesep.encode(self.inputs["encoding"])
+		(found, breaks) = (0, 0)
+		previous = separator # A separator at the start is a blank line
+		with open(filename, mode="rb") as f:
+			f.seek(start)
+			position = start
+			while position < end:
+				block = f.read(min(DataReader.block_size, end - position))
+				if len(block) == 0: return False
+				position += len(block)
 				
-			f += 1
+				# Separators and blank lines split across blocks are found in the end of the previous block joined to this one
+				edge = previous[-(2 * len(separator) - 1):] + block[:2 * len(separator) - 1]
+				if (separator * 2) in edge: return False
+				if (len(separator) > 1) and (position > start + len(block)) and (previous[-1:] + block[:1] == separator): found += 1
+				
+				found += block.count(separator)
+				breaks += block.count(b"\r") + block.count(b"\n")
+				if (separator * 2) in block: return False
+				previous = block
+		
+		return (found == count) and (breaks == count * len(separator)) and previous.endswith(separator)
+	
+	@staticmethod
+	def convert_range(inputs, filename, start, j, count, linesep, layout, fixed_map, fixed_length):
+		"""Convert a number of fixed-length records of a file from a byte offset in a worker process and return the output.
+		
+		Returns None unless every record is the required length and followed by the line separator, with no other line breaks.
+		"""
+		
+		width = fixed_length + len(linesep)
+		with open(filename, mode="rb") as f:
+			f.seek(start)
+			data = f.read(count * width)
+		
+		try:
+			text = data.decode(inputs["encoding"])
+		except UnicodeDecodeError as e:
+			return None
+		
+		if (len(text) != count * width) or (text.count("\n") + text.count("\r") != count * len(linesep)): return None
+		for (k, separator) in enumerate(linesep):
+			if text[fixed_length + k::width] != separator * count: return None
+		
+		lines = [text[position:position + fixed_length] for position in range(0, len(text), width)]
+		return FixedAction(inputs).convert_lines(lines, layout, fixed_map, fixed_length, j)
+	
+	def convert_lines(self, lines, layout, fixed_map, fixed_length, j):
+		"""Convert fixed-length lines to delimited lines, in batches with the numpy engine, and return the output."""
+		
+		if layout is not None:
+			return "".join(self.convert_batch(lines[k:k + self.batch_size], layout, fixed_map, fixed_length, j + k) for k in range(0, len(lines), self.batch_size))
+		
+		(delim, enclose, escape) = (self.inputs["delim"], self.inputs["enclose"], self.inputs["escape"])
+		return "".join(self.unparse_data(self.parse_fixed(line, fixed_map, fixed_length, j + k), delim, enclose, escape) + "\n" for (k, line) in enumerate(lines))
+	
+	@staticmethod
+	def fixed_layout(fixed_map, linefeed):
+		"""Return the NumPy structured data type of a fixed-length record, one string field per column, optionally followed by a line feed."""
+		
+		(names, formats, offsets) = ([], [], [0])
+		for (k, m) in enumerate(fixed_map + ([1] if linefeed else [])):
+			names.append("column{}".format(k) if k < len(fixed_map) else "linefeed")
+			formats.append("U{}".format(m))
+			offsets.append(offsets[-1] + 4 * m)
+		
+		return numpy.dtype({"names":names, "formats":formats, "offsets":offsets[:-1], "itemsize":offsets[-1]})
+	
+	def convert_batch(self, batch, layout, fixed_map, fixed_length, j):
+		"""Convert a batch of lines with NumPy and return the output lines.
+		
+		Values are copied in and out of the structured array a column at a time, as UTF-32 so any encoding works. NumPy drops
+		trailing NUL characters and can't lay out a record with the wrong number of columns, so those batches are converted a
+		record at a time.
+		"""
+		
+		if self.inputs["action"] == "delim-to-fixed":
+			columns = self.parse_columns(batch, len(fixed_map))
+			if (columns is None) or any("\0" in "".join(column) for column in columns):
+				return "".join(self.unparse_fixed(self.parse(line), fixed_map, fixed_length) + "\n" for line in batch)
+			
+			# NumPy truncates long values and pads short ones with NULs, which are spaces in the output
+			array = numpy.zeros(len(batch), dtype=layout)
+			for (k, column) in enumerate(columns): array["column{}".format(k)] = column
+			array["linefeed"] = "\n"
+			
+			return array.tobytes().decode("utf-32-le", "surrogatepass").replace("\0", " ")
+		
+		# The lines must all be the required length, the first one that isn't is reported like the record at a time conversion
+		if set(map(len, batch)) != {fixed_length}:
+			for (k, line) in enumerate(batch): self.parse_fixed(line, fixed_map, fixed_length, j + k)
+		text = "".join(batch)
+		
+		if "\0" in text:
+			columns = list(zip(*(self.parse_fixed(line, fixed_map, fixed_length, j + k) for (k, line) in enumerate(batch))))
+		else:
+			array = numpy.frombuffer(text.encode("utf-32-le", "surrogatepass"), dtype=layout)
+			columns = [list(map(str.strip, array[name].tolist())) for name in layout.names]
+		
+		# Enclose and escape every value like unparse_data
+		(delim, enclose, escape) = (self.inputs["delim"], self.inputs["enclose"], self.inputs["escape"])
+		if (enclose != "") and (enclose in text):
+			columns = [[value.replace(enclose, escape + enclose) for value in column] for column in columns]
+		lines = map((enclose + delim + enclose).join, zip(*columns))
+		
+		return enclose + (enclose + "\n" + enclose).join(lines) + enclose + "\n"
+		
+	def parse_columns(self, lines, count):
+		"""Parse a batch of delimited lines with a single csv reader and return their values a column at a time.
 		
-		return "Processed {} records sucessfully".format(i)
+		Returns None unless every line has count values and parses exactly like it would on its own with parse_data_csv.
+		"""
 		
+		(delim, enclose, escape) = (self.inputs["delim"], self.inputs["enclose"], self.inputs["escape"])
+		options = self.csv_options(delim, enclose, escape)
+		text = "".join(lines)
+		if (options is None) or ((enclose != "") and (escape != enclose) and (enclose in text)) or ("\n" in text) or ("\r" in text): return None
+		if ((count == 1) or (delim == " ")) and any(line.strip(" ") == "" for line in lines): return None
+		
+		# An unterminated enclosed value continues onto the next line, which leaves fewer records than lines
+		try:
+			records = list(csv.reader(lines, **options))
+		except csv.Error as e:
+			return None
+		if (len(records) != len(lines)) or (set(map(len, records)) != {count}): return None
+		
+		return [list(map(str.strip, column)) for column in zip(*records)]
+	
 	def parse_fixed(self, line, fixed_map, fixed_length, i):
 		"""Parse a fixed-length string into a list and return the result."""
 		
@@ -903,8 +2060,10 @@ class FixedAction(Action):
 class SplitAction(Action):
 	"""Class to perform actions that have multiple output files per input file."""
 	
-	def action(self):
-		"""Perform the task and return a message for the user."""
+	schedule_files = False
+	
+	def process_files(self):
+		"""Process the input files and return the number of records processed."""
 		
 		total_bytes = 0
 		for filename in self.inputs["input"]: total_bytes += 0 if filename == "STDIN" else os.path.getsize(filename)
@@ -912,24 +2071,42 @@ class SplitAction(Action):
 		# Loop over input files
 		b = i = f = 0
 		started = time.time()
+		timer = ProgressTimer(self.inputs["progress-interval"])
 		for input_filename in self.inputs["input"]:
+			dirname = os.path.dirname(input_filename)
+			if dirname != "": dirname += os.sep
+			(name, ext) = os.path.splitext(os.path.basename(input_filename))
+			
+			# Copy the lines of regular files without reading them when possible
+			if (self.inputs["action"] == "split-lines") and (input_filename != "STDIN"):
+				count = self.split_bytes(input_filename, dirname + name + "-", ext, started, b, total_bytes)
+				if count is not None:
+					b += os.path.getsize(input_filename)
+					i += count
+					f += 1
+					continue
+			
 			# Process the file
-			f_out = None
-			output_filename_current = None
-			output_filenames = []
+			filenames = {}
+			writers = WriterPool(self.open, self.inputs["encoding"], self.inputs["open-files"])
 			f_in = self.open(input_filename, "r", self.inputs["encoding"])
+			reader = None
 			try:
 				headers = self.inputs["headers"]
 				header_line = None
 				j = 0
-				reader = DataReader(f_in)
+				reader = self.reader(f_in)
+				
+				# Parts start at the first line at or after each part's share of the file, the header excluded, and are numbered without gaps
+				(start, span, share, part) = (None, None, None, 0)
+				end = reader.bytes if self.inputs["parts"] > 0 else None
+				
 				for line in reader:
-					b += len(line.encode(self.inputs["encoding"])) + len(reader.linesep)
 					
 					record = None
 					if self.inputs["action"] not in ["split-lines"]:
-						# Parse the data
-						record = self.parse_data(line, self.inputs["delim"], self.inputs["enclose"], self.inputs["escape"])
+						# Parse the data, the line is output as is so only the values up to the column are needed
+						record = self.parse(line, self.inputs["column"] + 1)
 						
 						# Column error checking
 						c = self.inputs["column"]
@@ -942,57 +2119,161 @@ class SplitAction(Action):
 					if not headers:
 						# Determine output filename
 						output_filename_record = None
-						dirname = os.path.dirname(input_filename)
-						if dirname != "": dirname += os.sep
-						(name, ext) = os.path.splitext(os.path.basename(input_filename))
-						if self.inputs["action"] == "split-lines":
+						if (self.inputs["action"] == "split-lines") and (self.inputs["parts"] > 0):
+							if start is None: (start, span) = (end, self.part_span(input_filename, end))
+							if min((end - start) // span, self.inputs["parts"] - 1) != share: (share, part) = (min((end - start) // span, self.inputs["parts"] - 1), part + 1)
+							output_filename_record = dirname + name + "-" + str(part) + ext
+						elif self.inputs["action"] == "split-lines":
 							output_filename_record = dirname + name + "-" + str((j//self.inputs["lines"]) + 1) + ext
 						elif self.inputs["action"] == "split-value":
-							tmp = re.sub("[^A-Za-z0-9 _-]+", "", record[self.inputs["column"]])
-							if tmp == "": tmp = "BLANK"
-							output_filename_record = dirname + name + "-" + tmp + ext
+							value = record[self.inputs["column"]]
+							if value not in filenames:
+								tmp = re.sub("[^A-Za-z0-9 _-]+", "", value)
+								if tmp == "": tmp = "BLANK"
+								filenames[value] = dirname + name + "-" + tmp + ext
+							output_filename_record = filenames[value]
 						else:
 							raise ValueError("Unknown action: {}".format(self.inputs["action"]))
 						
-						# Open the output file if needed
-						if (output_filename_current is None) or (output_filename_current != output_filename_record):
-							# Close previous file if needed
-							if output_filename_current is not None: f_out.close()
-							
-							# Open output file
-							output_filename_current = output_filename_record
-							mode = "a" if output_filename_current in output_filenames else "w"
-							f_out = self.open(output_filename_current, mode, self.inputs["encoding"])
-							if output_filename_current not in output_filenames:
-								output_filenames.append(output_filename_current)
-								
-								# Output the header if needed
-								if header_line is not None: f_out.write(header_line + "\n")
-						
-						# Output the line
-						f_out.write(line + "\n")
+						# Output the line, and the header first if the output file is new
+						writers.get(output_filename_record, header_line).write(line + "\n")
 						
 						j += 1
 						i += 1
 						
-						self.progress("Record: {}".format(i), started, b, total_bytes)
+						if timer.due(): self.progress("Record: {}".format(i), started, b + reader.bytes, total_bytes)
 					else:
 						headers = False
+					
+					if end is not None: end = reader.bytes
+				
+				b += reader.bytes
 			finally:
+				if reader is not None: reader.close()
 				if f_in != sys.stdin: f_in.close()
-				if f_out is not None: f_out.close()
+				writers.close()
 				
 			f += 1
 		
-		return "Processed {} records sucessfully".format(i)
+		return i
+	
+	def part_span(self, filename, start):
+		"""Return the number of bytes in each part of a file whose records start at the given byte offset."""
+		return max(1, -(-(os.path.getsize(filename) - start) // self.inputs["parts"]))
+	
+	def split_bytes(self, filename, prefix, ext, started, b, total_bytes):
+		"""Split a file by copying the bytes of each part to its output file and return the number of records, or None if it can't be copied as is.
+		
+		Only files with \n line endings, no blank lines and an encoding without a byte order mark are copied, since the lines of other files are
+		written with \n line endings and blank lines removed.
+		"""
+		
+		if not self.copyable(): return None
+		
+		with open(filename, mode="rb") as f_in:
+			header = f_in.readline() if self.inputs["headers"] else b""
+			if (header[:1] == b"\n") or (b"\r" in header): return None
+			
+			# Count the records, find where every part of lines records starts, and make sure the lines can be copied
+			start = len(header)
+			boundaries = [start]
+			count = 0
+			size = start
+			previous = b"\n"
+			for block in iter(lambda: f_in.read(DataReader.block_size), b""):
+				if (b"\r" in block) or (b"\n\n" in previous + block): return None
+				
+				newlines = block.count(b"\n")
+				if self.inputs["parts"] == 0:
+					needed = self.inputs["lines"] - (count % self.inputs["lines"])
+					if newlines >= needed:
+						ends = list(accumulate((len(part) + 1 for part in block.split(b"\n")), initial=size))[1:-1]
+						boundaries += ends[needed-1::self.inputs["lines"]]
+				
+				count += newlines
+				size += len(block)
+				previous = block[-1:]
+			
+			# The last line may not have a line ending
+			if previous != b"\n": count += 1
+			
+			# Parts start at the first line at or after each part's share of the file
+			if self.inputs["parts"] > 0:
+				span = self.part_span(filename, start)
+				for k in range(1, self.inputs["parts"]):
+					position = start + (k * span) - 1
+					if position >= size: break
+					f_in.seek(position)
+					while position < size:
+						block = f_in.read(64 * 1024)
+						n = block.find(b"\n")
+						if n >= 0:
+							position += n + 1
+							break
+						position += len(block)
+					if boundaries[-1] < position < size: boundaries.append(position)
+			
+			# Copy each part after the header
+			timer = ProgressTimer(self.inputs["progress-interval"])
+			ranges = [(x, y) for (x, y) in zip(boundaries, boundaries[1:] + [size]) if y > x]
+			for (k, (x, y)) in enumerate(ranges):
+				with open("{}{}{}".format(prefix, k + 1, ext), mode="wb", buffering=0) as f_out:
+					f_out.write(header)
+					self.copy_range(f_in, f_out, x, y)
+					if y == size and previous != b"\n": f_out.write(b"\n")
+				
+				if timer.due(): self.progress("Part: {}".format(k + 1), started, b + y, total_bytes)
+		
+		return count
 
 class DataReader:
-	"""Iterator for files that removes line endings and skips blank lines."""
+	"""Iterator for files that removes line endings and skips blank lines.
 	
-	def __init__(self, f):
+	The file is read a block at a time and split into lines in bulk. Partial lines are carried over to the next block.
+	
+	When the line endings of the file's encoding are single bytes, blocks are read from the underlying binary buffer so the number of bytes
+	consumed can be counted from the buffer instead of encoding each line again. It is available in self.bytes and is only calculated when
+	it's requested. Byte counts from the buffer include any part of the file before its position when the reader was created.
+	"""
+	
+	# Number of characters (or bytes) to read at a time
+	block_size = 4 * 1024 * 1024
+	
+	# Line endings recognized by readline() in universal newlines mode
+	separators = {str:re.compile("(\r\n|\r|\n)"), bytes:re.compile(b"(\r\n|\r|\n)")}
+	
+	def __init__(self, f, block_size=None):
 		"""Initialize the object."""
 		self.f = f
 		self.linesep = ""
+		self.block_size = block_size or DataReader.block_size
+		self.encoding = getattr(f, "encoding", None) or "utf-8"
+		self.errors = getattr(f, "errors", None) or "strict"
+		self.bom = 0 # Length of any byte order mark added by encode()
+		self.lines = []
+		self.seps = []
+		self.index = 0
+		self.partial = None
+		self.eof = False
+		self.last_linesep = ""
+		
+		# Byte counting state for the current block
+		self.parts = None
+		self.physical = ([], [])
+		self.keep = None
+		self.ends = []
+		self.block_start = 0
+		self.block_end = 0
+		self.current = None
+		
+		# Read the binary buffer directly if nothing has been read through the text layer yet
+		self.raw = None
+		try:
+			self.bom = len("".encode(self.encoding, self.errors))
+			if hasattr(f, "buffer") and ("\r\n".encode(self.encoding) == b"\r\n") and ((not f.seekable()) or (f.tell() == f.buffer.tell())): self.raw = f.buffer
+			if (self.raw is not None) and f.seekable(): self.block_end = self.raw.tell()
+		except (LookupError, OSError) as e:
+			pass
 	
 	def __iter__(self):
 		"""Make the class an iterator."""
@@ -1001,17 +2282,1044 @@ class DataReader:
 	def __next__(self):
 		"""Return the next non-blank line and store the line separator in self.linesep."""
 		while True:
-			line = self.f.readline()
-			if line == "":
+			if self.index < len(self.lines):
+				line = self.lines[self.index]
+				self.linesep = self.seps[self.index]
+				self.current = self.index
+				self.index += 1
+				return line
+			
+			# Count any blank lines at the end of the block
+			self.current = None
+			
+			if not self.read():
+				self.linesep = self.last_linesep
 				raise StopIteration()
+	
+	@property
+	def bytes(self):
+		"""Return the number of bytes consumed up to the end of the current line."""
+		if self.current is None: return self.block_end
+		if self.ends is None: self.ends = self.count()
+		return self.ends[self.current]
+	
+	def read(self):
+		"""Read the next block and split it into lines, return False at the end of the file."""
+		
+		if self.eof: return False
+		
+		block = self.raw.read(self.block_size) if self.raw is not None else self.f.read(self.block_size)
+		data = block if self.partial is None else self.partial + block
+		self.eof = (len(block) == 0)
+		
+		# Hold back the partial line at the end of the block, including a trailing \r that may be the first half of a \r\n
+		(nl, cr) = ("\n", "\r") if isinstance(data, str) else (b"\n", b"\r")
+		end = len(data)
+		if not self.eof:
+			if data[-1:] == cr: end -= 1
+			end = max(data.rfind(nl, 0, end), data.rfind(cr, 0, end)) + 1
+		(data, self.partial) = (data[:end], data[end:])
+		
+		if isinstance(data, str):
+			self.parts = None
+			self.load(data, len(data.encode(self.encoding, self.errors)) - self.bom)
+		else:
+			self.parts = data
+			self.load(data.decode(self.encoding, self.errors), len(data))
+		
+		return (len(self.lines) > 0) or (not self.eof)
+	
+	def load(self, text, size):
+		"""Split a block of complete lines into lines and separators. Size is the length of the block in bytes."""
+		
+		# Split into lines, the last item is the part after the last line ending
+		if "\r" not in text:
+			lines = text.split("\n")
+			last = lines.pop()
+			seps = ["\n"] * len(lines)
+		else:
+			lines = self.separators[str].split(text)
+			last = lines.pop()
+			seps = lines[1::2]
+			lines = lines[0::2]
+		
+		# The last line of the file may not have a line ending
+		if last != "":
+			lines.append(last)
+			seps.append("")
+		
+		if len(seps) > 0: self.last_linesep = seps[-1]
+		
+		# Save what's needed to count bytes later
+		self.physical = (lines, seps)
+		self.ends = None
+		self.block_start = self.block_end
+		self.block_end += size
+		
+		# Skip blank lines
+		self.keep = None
+		if "" in lines:
+			self.keep = [k for k in range(len(lines)) if lines[k] != ""]
+			lines = [lines[k] for k in self.keep]
+			seps = [seps[k] for k in self.keep]
+		
+		self.lines = lines
+		self.seps = seps
+		self.index = 0
+	
+	def count(self):
+		"""Return the byte offset of the end of each non-blank line in the current block."""
+		
+		(lines, seps) = self.physical
+		if self.parts is not None:
+			if b"\r" not in self.parts:
+				sizes = [len(p) + 1 for p in self.parts.split(b"\n")]
+				last = sizes.pop() - 1
+				if last > 0: sizes.append(last)
+			else:
+				parts = self.separators[bytes].split(self.parts)
+				sizes = [len(parts[k]) + len(parts[k+1]) for k in range(0, len(parts) - 1, 2)]
+				if parts[-1] != b"": sizes.append(len(parts[-1]))
+		else:
+			sizes = [len((lines[k] + seps[k]).encode(self.encoding, self.errors)) - self.bom for k in range(len(lines))]
+		
+		ends = list(accumulate(sizes, initial=self.block_start))[1:]
+		if self.keep is not None: ends = [ends[k] for k in self.keep]
+		
+		return ends
+	
+	def close(self):
+		"""Release anything held besides the file, which is closed by its owner."""
+		pass
+
+class MappedDataReader(DataReader):
+	"""DataReader for regular files that finds lines in a memory map of the file instead of reading it.
+	
+	Block boundaries are found with rfind() over the mapped region and each block is decoded straight from the map.
+	
+	Raises ValueError if the file can't be mapped, i.e., it's empty, not a regular file, or its encoding doesn't use single byte line
+	endings.
+	"""
+	
+	def __init__(self, f, block_size=None):
+		"""Initialize the object."""
+		super(MappedDataReader, self).__init__(f, block_size)
+		
+		if self.raw is None: raise ValueError("Line endings are not single bytes.")
+		
+		self.map = mmap.mmap(self.raw.fileno(), 0, access=mmap.ACCESS_READ)
+		self.view = memoryview(self.map)
+	
+	def read(self):
+		"""Decode the next block of the map and split it into lines, return False at the end of the file."""
+		
+		if self.eof:
+			self.close()
+			return False
+		
+		m = self.map
+		start = self.block_end
+		
+		# End the block after its last line ending, without splitting a \r\n, widening it for lines longer than a block
+		size = self.block_size
+		while True:
+			end = min(start + size, len(m))
+			if end < len(m):
+				stop = end - 1 if m[end-1] == 13 else end
+				end = max(m.rfind(b"\n", start, stop), m.rfind(b"\r", start, stop)) + 1
+			if end > start: break
+			size *= 2
+		
+		self.eof = (end >= len(m))
+		self.parts = None
+		self.load(str(self.view[start:end], self.encoding, self.errors), end - start)
+		
+		return (len(self.lines) > 0) or (not self.eof)
+	
+	def count(self):
+		"""Return the byte offset of the end of each non-blank line in the current block."""
+		self.parts = self.map[self.block_start:self.block_end]
+		return super(MappedDataReader, self).count()
+	
+	def close(self):
+		"""Release the memory map."""
+		if not self.map.closed:
+			self.view.release()
+			self.map.close()
+
+class SampledDataReader(DataReader):
+	"""DataReader for regular files that reads blocks of lines from random parts of the file instead of reading it in order.
+	
+	Only the first few complete lines of each block are kept so the sample is spread over the whole file. The first block is read from the
+	start of the file so headers are still the first line. Blocks may overlap, and reading stops once as many bytes have been read as the
+	file contains. Small files are read in order. The offsets are seeded so the same file is always sampled the same way.
+	
+	Raises ValueError if the file's encoding doesn't use single byte line endings.
+	"""
+	
+	# Number of bytes to read at each random offset, and the number of lines to keep from them
+	sample_size = 4 * 1024
+	sample_lines = 16
+	
+	def __init__(self, f, block_size=None, seed=0):
+		"""Initialize the object."""
+		super(SampledDataReader, self).__init__(f, block_size)
+		
+		if self.raw is None: raise ValueError("Sampling requires an encoding with single byte line endings.")
+		
+		self.start = self.raw.tell()
+		self.size = os.fstat(self.raw.fileno()).st_size
+		self.random = random.Random(seed)
+		self.sequential = (self.size - self.start) <= (256 * self.sample_size)
+		self.sampled = 0
+	
+	def read(self):
+		"""Read the next sampled block and split it into lines, return False once enough of the file has been sampled."""
+		
+		if self.sequential: return super(SampledDataReader, self).read()
+		
+		if self.eof or (self.sampled >= self.size - self.start):
+			self.eof = True
+			return False
+		
+		# Start with the beginning of the file, then random offsets, reading the byte before the offset to tell if it starts a line
+		offset = self.start if self.sampled == 0 else self.random.randrange(self.start + 1, self.size)
+		position = max(offset - 1, self.start)
+		self.raw.seek(position)
+		data = self.raw.read(self.sample_size + (offset - position))
+		at_end = (position + len(data) >= self.size)
+		self.sampled += len(data)
+		
+		# Skip to the first line that starts in the block
+		begin = 0
+		if offset > position:
+			if data[0:1] == b"\n":
+				begin = 1
+			elif (data[0:1] == b"\r") and (data[1:2] != b"\n"):
+				begin = 1
 			else:
-				if line[-2:] == "\r\n": self.linesep = "\r\n"
-				elif line[-1:] == "\r": self.linesep = "\r"
-				elif line[-1:] == "\n": self.linesep = "\n"
-				else: self.linesep = ""
+				match = self.separators[bytes].search(data, 1)
+				begin = len(data) if (match is None) or ((match.group() == b"\r") and (match.end() == len(data)) and not at_end) else match.end()
+		
+		# End after the last line ending, without splitting a \r\n
+		end = len(data)
+		if not at_end:
+			if data[-1:] == b"\r": end -= 1
+			end = max(data.rfind(b"\n", begin, end), data.rfind(b"\r", begin, end)) + 1
+		
+		# Keep the first few lines
+		lines = 0
+		for match in self.separators[bytes].finditer(data, begin, max(begin, end)):
+			lines += 1
+			if lines == self.sample_lines:
+				end = match.end()
+				break
+		
+		data = data[begin:end] if end > begin else b""
+		self.parts = data
+		self.load(data.decode(self.encoding, self.errors), len(data))
+		
+		return True
+
+class TypeClassifier:
+	"""Classifies values as integers, decimals, dates, times and date/times for analysis."""
+	
+	# Common date and time formats, tried in order
+	date_formats = [
+		"%Y-%m-%d",
+		"%m/%d/%Y", "%d-%m-%Y", "%d.%m.%Y", "%d %B %Y", "%B %d, %Y", "%d %b %Y", "%b %d, %Y", "%d-%B-%Y", "%d-%b-%Y",
+		"%m/%d/%y", "%d-%m-%y", "%d.%m.%y", "%d %B %y", "%B %d, %y", "%d %b %y", "%b %d, %y", "%d-%B-%y", "%d-%b-%y"
+	]
+	time_formats = ["%H:%M", "%H:%M:%S", "%I:%M %p", "%I:%M:%S %p"]
+	
+	# Loose patterns for each format directive, these must accept everything strptime accepts
+	directives = {
+		"Y":"\\d{4}", "y":"\\d{2}",
+		"m":" ?\\d{1,2}", "d":" ?\\d{1,2}", "H":" ?\\d{1,2}", "I":" ?\\d{1,2}", "M":" ?\\d{1,2}", "S":" ?\\d{1,2}",
+		"B":"\\D+?", "b":"\\D+?", "p":"\\D+?"
+	}
+	
+	# Exact patterns for numeric format directives, the same as strptime uses
+	numeric = {
+		"Y":"(?P<Y>\\d\\d\\d\\d)",
+		"y":"(?P<y>\\d\\d)",
+		"m":"(?P<m>1[0-2]|0[1-9]|[1-9])",
+		"d":"(?P<d>3[0-1]|[1-2]\\d|0[1-9]|[1-9]| [1-9])",
+		"H":"(?P<H>2[0-3]|[0-1]\\d|\\d)",
+		"M":"(?P<M>[0-5]\\d|\\d)",
+		"S":"(?P<S>6[0-1]|[0-5]\\d|\\d)"
+	}
+	
+	leading_zero = re.compile("^0")
+	leading_zero_digit = re.compile("^0[^\\.]")
+	period = re.compile("\\.")
+	
+	def __init__(self):
+		"""Initialize the object."""
+		
+		datetime_formats = []
+		for d in self.date_formats:
+			for t in self.time_formats:
+				datetime_formats.append("{} {}".format(d, t))
+		self.formats = {"date":self.date_formats, "time":self.time_formats, "datetime":datetime_formats}
+		
+		# Compile the shape of every format, and an exact parser for formats that only use numeric directives
+		self.shapes = {}
+		self.parsers = {}
+		for formats in self.formats.values():
+			for format in formats:
+				tokens = re.findall("%.|\\s+|[^%\\s]+", format)
+				
+				pattern = "".join(self.directives[token[1]] if token.startswith("%") else ("\\s+" if token.isspace() else re.escape(token)) for token in tokens)
+				self.shapes[format] = re.compile(pattern, re.IGNORECASE)
+				
+				if all((token[1] in self.numeric) for token in tokens if token.startswith("%")):
+					pattern = "".join(self.numeric[token[1]] if token.startswith("%") else ("\\s+" if token.isspace() else re.escape(token)) for token in tokens)
+					self.parsers[format] = re.compile(pattern, re.IGNORECASE)
+	
+	def integer(self, value):
+		"""Return value as an int, or None if it is not an integer."""
+		
+		if (value != "0") and self.leading_zero.search(value): return None
+		if self.period.search(value): return None
+		
+		try:
+			return int(value)
+		except Exception as e:
+			return None
+	
+	def decimal(self, value):
+		"""Return value as a float, or None if it is not a decimal."""
+		
+		if self.leading_zero_digit.search(value): return None
+		
+		try:
+			return float(value)
+		except Exception as e:
+			return None
+	
+	def parse(self, key, value, format=None):
+		"""Return a (datetime, format) tuple for value using format or the first matching format for key (date, time or datetime), or (None, None)."""
+		
+		for format in ([format] if format is not None else self.formats[key]):
+			if format in self.parsers:
+				# Parse numeric formats directly, following strptime's rules
+				match = self.parsers[format].match(value)
+				if (match is None) or (match.end() != len(value)): continue
+				
+				fields = match.groupdict()
+				if "Y" in fields:
+					year = int(fields["Y"])
+				elif "y" in fields:
+					year = int(fields["y"])
+					year += 2000 if year <= 68 else 1900
+				else:
+					year = 1900
 				
-				line = line.strip("\r\n")
-				if line != "": return line
+				try:
+					return (datetime(year, int(fields.get("m", 1)), int(fields.get("d", 1)), int(fields.get("H", 0)), int(fields.get("M", 0)), int(fields.get("S", 0))), format)
+				except Exception as e:
+					continue
+			
+			# Rule out the format cheaply before calling strptime
+			if not self.shapes[format].fullmatch(value): continue
+			
+			try:
+				return (datetime.strptime(value, format), format)
+			except Exception as e:
+				pass
+		
+		return (None, None)
+	
+	def parse_all(self, key, value):
+		"""Return a list of (datetime, format) tuples for every format for key (date, time or datetime) that value matches, in order."""
+		
+		matches = []
+		for format in self.formats[key]:
+			match = self.parse(key, value, format)
+			if match[0] is not None: matches.append(match)
+		
+		return matches
+
+class ColumnStats:
+	"""Statistics about the values in one column of an analyzed file, which can be read like a dict.
+	
+	The statistics for consecutive parts of a file can be merged to get the same result as analyzing the whole file at once. To allow
+	that, the statistics of a chunk keep its decimal values so they're added to the total in the same order, and every date/time format
+	that matches all of the values is tracked, not just the format of the first value. Sketches can't be merged.
+	"""
+	
+	# Date/time types and the keys of their formats
+	temporal = [("date", "date-formats"), ("time", "time-formats"), ("datetime", "datetime-formats")]
+	
+	booleans = frozenset(["0", "1", "Y", "N", "y", "n", "Yes", "No", "YES", "NO", "yes", "no", "T", "F", "True", "False", "TRUE", "FALSE", "true", "false"])
+	
+	def __init__(self, name, sketch=False, chunk=False):
+		"""Initialize the object, chunk keeps the decimal values so the statistics can be merged into an earlier part's."""
+		
+		self.stats = {
+			"name":name,
+			
+			"length-min":None,
+			"length-avg":0,
+			"length-max":None,
+			
+			"text-min":None,
+			"text-max":None,
+			
+			"integer":True,
+			"integer-min":None,
+			"integer-avg":0,
+			"integer-max":None,
+			
+			"decimal":True,
+			"decimal-min":None,
+			"decimal-avg":0.0,
+			"decimal-max":None,
+			
+			"boolean":True,
+			
+			"empty":0,
+			"null":0,
+			
+			"values":{}
+		}
+		
+		# Formats that have matched every value so far with the minimum and maximum for each one, None until there's a value
+		for key in ["date", "time", "datetime"]:
+			self.stats.update({key:True, key + "-format":None, key + "-min":None, key + "-max":None, key + "-formats":None})
+		
+		if sketch:
+			self.stats["sketch"] = {
+				"distinct":HyperLogLog(),
+				"frequent":SpaceSaving(),
+				"lengths" :Reservoir(),
+				"numbers" :Reservoir()
+			}
+		
+		self.decimals = array.array("d") if chunk else None
+	
+	def __getitem__(self, key):
+		"""Return a statistic."""
+		return self.stats[key]
+	
+	def __setitem__(self, key, value):
+		"""Set a statistic."""
+		self.stats[key] = value
+	
+	def __contains__(self, key):
+		"""Return True if the statistic exists."""
+		return key in self.stats
+	
+	def add(self, value, classifier):
+		"""Add a value using a TypeClassifier."""
+		
+		d = self.stats
+		if value == "":
+			d["empty"] += 1
+			return
+		elif (value == "NULL") or (value == "\\N"):
+			d["null"] += 1
+			return
+		
+		d["length-min"] = len(value) if d["length-min"] is None else min(len(value), d["length-min"])
+		d["length-avg"] += len(value)
+		d["length-max"] = len(value) if d["length-max"] is None else max(len(value), d["length-max"])
+		
+		d["text-min"] = value if d["text-min"] is None else min(value, d["text-min"])
+		d["text-max"] = value if d["text-max"] is None else max(value, d["text-max"])
+		
+		if d["integer"]:
+			val = classifier.integer(value)
+			if val is not None:
+				d["integer-min"] = val if d["integer-min"] is None else int(min(val, d["integer-min"]))
+				d["integer-avg"] += val
+				d["integer-max"] = val if d["integer-max"] is None else int(max(val, d["integer-max"]))
+			else:
+				d["integer"] = False
+		
+		if d["decimal"]:
+			val = classifier.decimal(value)
+			if val is not None:
+				d["decimal-min"] = val if d["decimal-min"] is None else min(val, d["decimal-min"])
+				d["decimal-avg"] += val
+				if self.decimals is not None: self.decimals.append(val)
+				d["decimal-max"] = val if d["decimal-max"] is None else max(val, d["decimal-max"])
+			else:
+				d["decimal"] = False
+		
+		for (key, key_formats) in self.temporal:
+			formats = d[key_formats]
+			if formats is None:
+				# The first value decides the format, but keep every other one that matches in case this is merged with an earlier part
+				d[key_formats] = {format:[value, val, value, val] for (val, format) in classifier.parse_all(key, value)}
+				d[key + "-format"] = next(iter(d[key_formats]), None)
+				self.update_format(key)
+			elif formats:
+				for format in list(formats):
+					val = classifier.parse(key, value, format)[0]
+					if val is None:
+						del formats[format]
+						continue
+					
+					bounds = formats[format]
+					if val < bounds[1]: (bounds[0], bounds[1]) = (value, val)
+					if val > bounds[3]: (bounds[2], bounds[3]) = (value, val)
+				self.update_format(key)
+		
+		if d["boolean"]:
+			if value not in self.booleans: d["boolean"] = False
+		
+		if "sketch" in d:
+			# Fixed memory summaries, exact values are only kept while the field could be a boolean
+			sketch = d["sketch"]
+			sketch["distinct"].add(value)
+			sketch["frequent"].add(value)
+			sketch["lengths"].add(len(value))
+			if d["decimal"]: sketch["numbers"].add(float(value))
+			
+			if d["boolean"]:
+				if value not in d["values"]: d["values"][value] = 0
+				d["values"][value] += 1
+			else:
+				d["values"] = {}
+		else:
+			if value not in d["values"]: d["values"][value] = 0
+			d["values"][value] += 1
+	
+	def add_batch(self, values, classifier):
+		"""Add a list of values using a TypeClassifier, checking integers, decimals, lengths and counts with NumPy.
+		
+		The result is the same as adding the values one at a time. Date/time formats are still checked one value at a time while any format
+		could match, and anything NumPy can't convert is checked one value at a time as well.
+		"""
+		
+		d = self.stats
+		
+		nonempty = [value for value in values if (value != "") and (value != "NULL") and (value != "\\N")]
+		empty = values.count("")
+		d["empty"] += empty
+		d["null"] += len(values) - len(nonempty) - empty
+		if len(nonempty) == 0: return
+		
+		lengths = numpy.fromiter(map(len, nonempty), dtype=numpy.int64, count=len(nonempty))
+		
+		# NumPy strings can't hold long values efficiently or end with a null character
+		text = None
+		if (d["integer"] or d["decimal"]) and (lengths.max() <= 64):
+			text = numpy.array(nonempty)
+			if (numpy.char.str_len(text) != lengths).any(): text = None
+		
+		(shortest, longest) = (int(lengths.min()), int(lengths.max()))
+		d["length-min"] = shortest if d["length-min"] is None else min(shortest, d["length-min"])
+		d["length-avg"] += int(lengths.sum())
+		d["length-max"] = longest if d["length-max"] is None else max(longest, d["length-max"])
+		
+		(lowest, highest) = (min(nonempty), max(nonempty))
+		d["text-min"] = lowest if d["text-min"] is None else min(lowest, d["text-min"])
+		d["text-max"] = highest if d["text-max"] is None else max(highest, d["text-max"])
+		
+		zero = None if text is None else numpy.char.startswith(text, "0")
+		
+		if d["integer"]:
+			ints = None
+			if text is not None:
+				if (zero & (text != "0")).any() or (numpy.char.find(text, ".") >= 0).any():
+					d["integer"] = False
+				else:
+					try:
+						ints = text.astype(numpy.int64)
+					except (ValueError, OverflowError) as e:
+						pass
+			
+			if ints is not None:
+				(lowest, highest) = (int(ints.min()), int(ints.max()))
+				d["integer-min"] = lowest if d["integer-min"] is None else int(min(lowest, d["integer-min"]))
+				d["integer-max"] = highest if d["integer-max"] is None else int(max(highest, d["integer-max"]))
+				
+				# Sum in Python when the total might not fit in 64 bits
+				if max(abs(lowest), abs(highest)) < (2**63 - 1) // len(nonempty):
+					d["integer-avg"] += int(ints.sum())
+				else:
+					d["integer-avg"] += sum(ints.tolist())
+			elif d["integer"]:
+				for value in nonempty:
+					val = classifier.integer(value)
+					if val is None:
+						d["integer"] = False
+						break
+					d["integer-min"] = val if d["integer-min"] is None else int(min(val, d["integer-min"]))
+					d["integer-avg"] += val
+					d["integer-max"] = val if d["integer-max"] is None else int(max(val, d["integer-max"]))
+		
+		if d["decimal"]:
+			floats = None
+			if text is not None:
+				if (zero & (lengths > 1) & ~numpy.char.startswith(text, "0.")).any():
+					d["decimal"] = False
+				else:
+					try:
+						floats = text.astype(numpy.float64)
+					except ValueError as e:
+						pass
+			
+			if floats is not None:
+				# Cumulative sums add the values one at a time in order, unlike sum()
+				d["decimal-avg"] = float(numpy.cumsum(numpy.concatenate(([d["decimal-avg"]], floats)))[-1])
+				if self.decimals is not None: self.decimals.frombytes(floats.tobytes())
+				
+				# Ties between 0.0 and -0.0, and NaN, depend on the order of the values
+				(lowest, highest) = (floats.min(), floats.max())
+				if numpy.isnan(lowest) or (lowest == 0) or (highest == 0):
+					for val in floats.tolist():
+						d["decimal-min"] = val if d["decimal-min"] is None else min(val, d["decimal-min"])
+						d["decimal-max"] = val if d["decimal-max"] is None else max(val, d["decimal-max"])
+				else:
+					(lowest, highest) = (float(lowest), float(highest))
+					d["decimal-min"] = lowest if d["decimal-min"] is None else min(lowest, d["decimal-min"])
+					d["decimal-max"] = highest if d["decimal-max"] is None else max(highest, d["decimal-max"])
+			elif d["decimal"]:
+				for value in nonempty:
+					val = classifier.decimal(value)
+					if val is None:
+						d["decimal"] = False
+						break
+					d["decimal-min"] = val if d["decimal-min"] is None else min(val, d["decimal-min"])
+					d["decimal-avg"] += val
+					if self.decimals is not None: self.decimals.append(val)
+					d["decimal-max"] = val if d["decimal-max"] is None else max(val, d["decimal-max"])
+		
+		# Only check the formats that could still match
+		for (key, key_formats) in self.temporal:
+			if (d[key_formats] is None) or d[key_formats]:
+				for value in nonempty:
+					formats = d[key_formats]
+					if formats is None:
+						d[key_formats] = {format:[value, val, value, val] for (val, format) in classifier.parse_all(key, value)}
+						d[key + "-format"] = next(iter(d[key_formats]), None)
+					elif formats:
+						for format in list(formats):
+							val = classifier.parse(key, value, format)[0]
+							if val is None:
+								del formats[format]
+								continue
+							
+							bounds = formats[format]
+							if val < bounds[1]: (bounds[0], bounds[1]) = (value, val)
+							if val > bounds[3]: (bounds[2], bounds[3]) = (value, val)
+					else:
+						break
+				self.update_format(key)
+		
+		counts = Counter(nonempty)
+		
+		if d["boolean"] and not (counts.keys() <= self.booleans): d["boolean"] = False
+		
+		if d["values"]:
+			for (value, count) in counts.items(): d["values"][value] = d["values"].get(value, 0) + count
+		else:
+			d["values"] = dict(counts)
+	
+	def update_format(self, key):
+		"""Update the type flag, minimum and maximum for key (date, time or datetime) from the format of the first value."""
+		
+		d = self.stats
+		bounds = d[key + "-formats"].get(d[key + "-format"])
+		if bounds is None:
+			d[key] = False
+		else:
+			(d[key + "-min"], d[key + "-max"]) = (bounds[0], bounds[2])
+	
+	def dump(self):
+		"""Return the statistics as a dict that can be saved as JSON. Sketches can't be saved."""
+		
+		d = {key:value for (key, value) in self.stats.items() if key != "sketch"}
+		for (key, key_formats) in self.temporal:
+			if d[key_formats] is not None: d[key_formats] = {format:[bounds[0], bounds[1].isoformat(), bounds[2], bounds[3].isoformat()] for (format, bounds) in d[key_formats].items()}
+		
+		return d
+	
+	@classmethod
+	def load(cls, d):
+		"""Return a ColumnStats object from statistics returned by dump()."""
+		
+		stats = cls(d["name"])
+		if d.keys() != stats.stats.keys(): raise KeyError("Statistics saved by a different version")
+		stats.stats.update(d)
+		for (key, key_formats) in cls.temporal:
+			if d[key_formats] is not None: stats[key_formats] = {format:[bounds[0], datetime.fromisoformat(bounds[1]), bounds[2], datetime.fromisoformat(bounds[3])] for (format, bounds) in d[key_formats].items()}
+		
+		return stats
+	
+	def merge(self, other):
+		"""Merge in the statistics of the part of the file that comes after this one, which must be a chunk's."""
+		
+		def bound(function, later, earlier):
+			# Ties are won by the later value, like min() and max() with the new value first
+			if earlier is None: return later
+			if later is None: return earlier
+			return function(later, earlier)
+		
+		for key in ["length", "integer", "decimal"]:
+			self[key + "-min"] = bound(min, other[key + "-min"], self[key + "-min"])
+			self[key + "-max"] = bound(max, other[key + "-max"], self[key + "-max"])
+		self["text-min"] = bound(min, other["text-min"], self["text-min"])
+		self["text-max"] = bound(max, other["text-max"], self["text-max"])
+		
+		self["length-avg"] += other["length-avg"]
+		self["integer-avg"] += other["integer-avg"]
+		
+		# Add the later part's decimals one at a time so the total is rounded the same way as in one pass
+		total = self["decimal-avg"]
+		for val in other.decimals: total += val
+		self["decimal-avg"] = total
+		if self.decimals is not None: self.decimals.extend(other.decimals)
+		
+		for key in ["integer", "decimal", "boolean"]: self[key] = self[key] and other[key]
+		
+		for key in ["date", "time", "datetime"]:
+			(formats, later) = (self[key + "-formats"], other[key + "-formats"])
+			if later is None: continue
+			
+			if formats is None:
+				for suffix in ["", "-format", "-min", "-max", "-formats"]: self[key + suffix] = other[key + suffix]
+				continue
+			
+			# Keep the formats that matched both parts, ties are won by the earlier value
+			for format in list(formats):
+				if format not in later:
+					del formats[format]
+					continue
+				
+				(bounds, bounds_later) = (formats[format], later[format])
+				if bounds_later[1] < bounds[1]: (bounds[0], bounds[1]) = bounds_later[0:2]
+				if bounds_later[3] > bounds[3]: (bounds[2], bounds[3]) = bounds_later[2:4]
+			self.update_format(key)
+		
+		self["empty"] += other["empty"]
+		self["null"] += other["null"]
+		
+		for (value, count) in other["values"].items(): self["values"][value] = self["values"].get(value, 0) + count
+
+class BloomFilter:
+	"""Tests whether string values were added using a fixed amount of memory.
+	
+	Values that were added are always found, values that weren't are found at roughly the given error rate.
+	"""
+	
+	def __init__(self, capacity, error=0.001):
+		"""Initialize the object with enough bits for capacity values."""
+		self.size = max(int(-capacity * math.log(error) / (math.log(2) ** 2)), 8)
+		self.hashes = max(int(round(self.size / max(capacity, 1) * math.log(2))), 1)
+		self.bits = bytearray((self.size + 7) // 8)
+	
+	def positions(self, value):
+		"""Return the bit positions for a string value."""
+		h = hashlib.blake2b(value.encode("utf-8", "surrogatepass"), digest_size=16).digest()
+		(h1, h2) = (int.from_bytes(h[0:8], "big"), int.from_bytes(h[8:16], "big") | 1)
+		return [(h1 + k * h2) % self.size for k in range(self.hashes)]
+	
+	def add(self, value):
+		"""Add a string value."""
+		for p in self.positions(value): self.bits[p >> 3] |= 1 << (p & 7)
+	
+	def __contains__(self, value):
+		"""Return True if the value was probably added."""
+		return all(self.bits[p >> 3] & (1 << (p & 7)) for p in self.positions(value))
+
+class HyperLogLog:
+	"""Estimates the number of distinct values using a fixed amount of memory."""
+	
+	def __init__(self, precision=14):
+		"""Initialize the object with 2**precision registers."""
+		self.precision = precision
+		self.registers = bytearray(1 << precision)
+	
+	def add(self, value):
+		"""Add a string value."""
+		h = int.from_bytes(hashlib.blake2b(value.encode("utf-8", "surrogatepass"), digest_size=8).digest(), "big")
+		k = h >> (64 - self.precision)
+		rest = (h << self.precision) & 0xFFFFFFFFFFFFFFFF
+		rank = (64 - self.precision + 1) if rest == 0 else (65 - rest.bit_length())
+		if rank > self.registers[k]: self.registers[k] = rank
+	
+	def count(self):
+		"""Return the estimated number of distinct values."""
+		
+		m = len(self.registers)
+		estimate = (0.7213 / (1 + 1.079 / m)) * m * m / sum(2.0 ** -r for r in self.registers)
+		
+		# Use linear counting for small cardinalities
+		zeros = self.registers.count(0)
+		if (estimate <= 2.5 * m) and (zeros > 0): estimate = m * math.log(m / zeros)
+		
+		return int(round(estimate))
+
+class SpaceSaving:
+	"""Tracks the most frequent values using a fixed number of counters."""
+	
+	def __init__(self, size=100):
+		"""Initialize the object."""
+		self.size = size
+		self.counters = {}
+		self.order = {}
+		self.sequence = 0
+		# Lazy min-heap of (count, order, value), entries are stale once the value's count or order changed
+		self.heap = []
+	
+	def add(self, value):
+		"""Add a value."""
+		if value in self.counters:
+			self.counters[value] += 1
+		elif len(self.counters) < self.size:
+			self.counters[value] = 1
+			self.sequence += 1
+			self.order[value] = self.sequence
+		else:
+			# Replace the least frequent value (the oldest one on ties), inheriting its count
+			while True:
+				(count, order, least) = heapq.heappop(self.heap)
+				if self.counters.get(least) == count and self.order[least] == order: break
+			del self.counters[least], self.order[least]
+			self.counters[value] = count + 1
+			self.sequence += 1
+			self.order[value] = self.sequence
+		heapq.heappush(self.heap, (self.counters[value], self.order[value], value))
+		# Drop the stale entries once they outnumber the live ones
+		if len(self.heap) > 2 * self.size + 100:
+			self.heap = [(count, self.order[value], value) for (value, count) in self.counters.items()]
+			heapq.heapify(self.heap)
+	
+	def top(self, n):
+		"""Return a list of (value, count) tuples for the n most frequent values. Counts may be overestimated."""
+		return sorted(self.counters.items(), key=lambda item: (-item[1], item[0]))[0:n]
+
+class Reservoir:
+	"""Keeps a fixed size uniform sample of numbers for estimating quantiles."""
+	
+	def __init__(self, size=1000):
+		"""Initialize the object."""
+		self.size = size
+		self.sample = []
+		self.count = 0
+		self.random = random.Random(0)
+	
+	def add(self, value):
+		"""Add a number."""
+		self.count += 1
+		if len(self.sample) < self.size:
+			self.sample.append(value)
+		else:
+			k = self.random.randrange(self.count)
+			if k < self.size: self.sample[k] = value
+	
+	def quantile(self, q):
+		"""Return the estimated q quantile (0 to 1)."""
+		ordered = sorted(self.sample)
+		return ordered[min(int(q * len(ordered)), len(ordered) - 1)]
+
+class ConversionPlan:
+	"""How sql-prepare converts the values of one column, learned from the values in the first records of each file.
+	
+	Once every sampled value that contains a digit was converted the same way, i.e., to a number, with the same date/time format or not at
+	all, later values are converted that way directly. Values the plan can't convert are left to the generic conversion, and columns with
+	mixed samples are always converted the generic way.
+	"""
+	
+	# Number of records whose values are sampled before the plans are decided
+	sample_size = 100
+	
+	digit = re.compile("\\d")
+	date = re.compile("\\d{4}-\\d{2}-\\d{2}( \\d{2}:\\d{2}:\\d{2})?")
+	time = re.compile("\\d{2}:\\d{2}:\\d{2}")
+	
+	def __init__(self):
+		"""Initialize the object."""
+		self.kind = None # None while sampling, then text, number, datetime, time or generic
+		self.kinds = set()
+		self.symbols = set()
+		self.formats = None
+		self.format = None
+	
+	def learn(self, value, converted, classifier):
+		"""Add a sampled value and its generic conversion using a TypeClassifier."""
+		
+		if not self.digit.search(value): return
+		
+		if isinstance(converted, (int, float)):
+			kind = "number"
+			self.symbols.update(c for c in BasicAction.currency_symbols if c in value)
+		elif self.date.fullmatch(converted) or self.time.fullmatch(converted):
+			# Keep the formats that give the same result for every value
+			kind = "time" if self.time.fullmatch(converted) else "datetime"
+			matches = []
+			for key in (["time"] if kind == "time" else ["date", "datetime"]):
+				for format in classifier.formats[key]:
+					val = classifier.parse(key, value, format)[0]
+					if (val is not None) and (self.output(kind, val) == converted): matches.append((key, format))
+			self.formats = matches if self.formats is None else [format for format in self.formats if format in matches]
+		else:
+			kind = "text"
+		
+		self.kinds.add(kind)
+	
+	def decide(self):
+		"""Decide the plan from the values sampled so far."""
+		
+		if self.kind is not None: return
+		
+		self.kind = self.kinds.pop() if len(self.kinds) == 1 else "generic"
+		if self.kind in ["datetime", "time"]:
+			self.format = self.formats[0] if self.formats else None
+			if self.format is None: self.kind = "generic"
+		self.symbols = [c for c in BasicAction.currency_symbols if c in self.symbols]
+	
+	def convert(self, value, classifier):
+		"""Return a value converted with the plan using a TypeClassifier, or None if the plan can't convert it."""
+		
+		# Values without digits, i.e., empty values that become NULL, are always converted the generic way
+		if (self.kind == "generic") or (not self.digit.search(value)): return None
+		if self.kind == "text": return value
+		
+		if self.kind == "number":
+			# Only remove the currency symbols that were sampled
+			num = value
+			for c in self.symbols: num = num.replace(c, "")
+			num = num.replace("%", "").replace(",", "").replace(" ", "")
+			if (num[0] == "(") and (num[-1] == ")"): num = "-" + num[1:-1]
+			
+			try:
+				return int(num)
+			except ValueError:
+				try:
+					return float(num)
+				except ValueError:
+					return None
+		
+		val = classifier.parse(self.format[0], value, self.format[1])[0]
+		return None if val is None else self.output(self.kind, val)
+	
+	@staticmethod
+	def output(kind, val):
+		"""Return a datetime formatted the way sql-prepare formats a datetime (or time) kind of value."""
+		if kind == "time": return val.strftime("%H:%M:%S")
+		if (val.hour == 0) and (val.minute == 0) and (val.second == 0): return val.strftime("%Y-%m-%d")
+		return val.strftime("%Y-%m-%d %H:%M:%S")
+
+class ValueCache:
+	"""Least recently used cache of values computed from strings, which counts its hits and misses in a Counter.
+	
+	The cache can be saved to a file and loaded again so later runs start with the values that were used most recently.
+	"""
+	
+	# Default maximum number of values
+	size = 64 * 1024
+	
+	def __init__(self, size=None, counters=None):
+		"""Initialize the object."""
+		self.size = size or ValueCache.size
+		self.values = OrderedDict()
+		self.counters = Counter() if counters is None else counters
+		self.counters.update({"cache hits":0, "cache misses":0})
+	
+	def get(self, key, function):
+		"""Return the value for key, calling function(key) if it isn't cached."""
+		
+		try:
+			value = self.values[key]
+		except KeyError as e:
+			self.counters["cache misses"] += 1
+			value = self.values[key] = function(key)
+			if len(self.values) > self.size: self.values.popitem(last=False)
+			return value
+		
+		self.counters["cache hits"] += 1
+		self.values.move_to_end(key)
+		return value
+	
+	def load(self, filename):
+		"""Load the values saved in a file, keeping the cache empty if it doesn't exist or can't be read."""
+		
+		try:
+			with open(filename, mode="r", encoding="utf-8") as f: values = json.load(f)
+			for (key, value) in values[-self.size:]: self.values[key] = value
+		except (OSError, ValueError, TypeError) as e:
+			pass
+	
+	def save(self, filename, keep=None):
+		"""Save the values to a file, least recently used first, only the ones keep(key, value) is true for if it's given."""
+		
+		# Replace the old file only once the new one is complete, several processes may be saving at once
+		temp_filename = "{}.{}.tmp".format(filename, os.getpid())
+		with open(temp_filename, mode="w", encoding="utf-8") as f: json.dump([item for item in self.values.items() if (keep is None) or keep(*item)], f)
+		os.replace(temp_filename, filename)
+
+class WriterPool:
+	"""Class to keep a limited number of output files open for writing, closing the least recently used one when another is needed."""
+	
+	# Default number of open files
+	size = 64
+	
+	def __init__(self, open, encoding, size=None):
+		"""Initialize the object."""
+		self.open = open
+		self.encoding = encoding
+		self.size = self.size if size is None else size
+		self.files = OrderedDict()
+		self.created = set()
+	
+	def get(self, filename, header_line=None):
+		"""Return the open file for filename, appending to it if it was already created and otherwise creating it with the header line if there is one."""
+		
+		if filename in self.files:
+			self.files.move_to_end(filename)
+			return self.files[filename]
+		
+		if len(self.files) >= self.size: self.files.popitem(last=False)[1].close()
+		
+		if filename in self.created:
+			f = self.open(filename, "a", self.encoding)
+		else:
+			f = self.open(filename, "w", self.encoding)
+			self.created.add(filename)
+			if header_line is not None: f.write(header_line + "\n")
+		
+		self.files[filename] = f
+		return f
+	
+	def close(self):
+		"""Close every open file."""
+		while self.files: self.files.popitem(last=False)[1].close()
+
+class ProgressTimer:
+	"""Decides when progress should be reported so it isn't formatted and output for every record."""
+	
+	# Default number of milliseconds between progress updates
+	interval = 250
+	
+	# Number of records between checks of the clock
+	records = 100
+	
+	def __init__(self, interval=None):
+		"""Initialize the object. An interval of 0 disables progress updates."""
+		self.seconds = (ProgressTimer.interval if interval is None else interval) / 1000
+		self.countdown = 1
+		self.last = 0.0
+	
+	def due(self):
+		"""Return True if it's time to report progress."""
+		
+		if self.seconds <= 0: return False
+		
+		self.countdown -= 1
+		if self.countdown > 0: return False
+		self.countdown = self.records
+		
+		now = time.time()
+		if (now - self.last) < self.seconds: return False
+		self.last = now
+		
+		return True
 
 class CLI(BaseCLI):
 	"""Class for defining the command line interface."""
@@ -1033,8 +3341,12 @@ class CLI(BaseCLI):
 			("find"      , "" , "Value/pattern to find"                , "value"),
 			("replace"   , "" , "Replacement value/pattern"            , "value"),
 			("invert"    , "" , "Invert match"                         , "boolean"),
+			("keys"      , "" , "File of values to match (12)"         , "value"),
 			("lines"     , "" , "Number of lines"                      , "value"),
-			("pattern"   , "" , "Regular expression\n"                 , "value"),
+			("parts"     , "" , "Number of parts of about the same size", "value"),
+			("skip"      , "" , "Number of records to skip (15)"       , "value"),
+			("pattern"   , "" , "Regular expression"                   , "value"),
+			("pipeline"  , "" , "File of actions to perform next (13)\n", "value"),
 			
 			("input"     , "i", "Input filename(s), omit for STDIN"    , "multiple"),
 			("output"    , "o", "Output filename, omit for STDOUT (3)" , "value"),
@@ -1042,7 +3354,19 @@ class CLI(BaseCLI):
 			("enclose"   , "e", "Enclose character"                    , "value"),
 			("escape"    , "s", "Escape character"                     , "value"),
 			("encoding"  , "c", "File encoding (i.e., utf-8 or cp1252)", "value"),
-			("headers"   , "H", "Input contains headers"               , "boolean")
+			("headers"   , "H", "Input contains headers\n"             , "boolean"),
+			
+			("engine"           , "", "Record parser engine (4)"                      , "value"),
+			("progress-interval", "", "Milliseconds between progress updates (5)"     , "value"),
+			("mmap"             , "", "Memory map input files instead of reading them", "boolean"),
+			("jobs"             , "", "Number of worker processes (6)"                , "value"),
+			("sketch"           , "", "Analyze with fixed memory per column (7)"      , "boolean"),
+			("sample"           , "", "Analyze a random sample of records (8)"        , "value"),
+			("profile"          , "", "Analyze only newly appended records (9)"       , "boolean"),
+			("cache"            , "", "Number of values cached by sql-prepare (10)"   , "value"),
+			("cache-file"       , "", "File to keep sql-prepare's cache in (10)"      , "value"),
+			("plan"             , "", "Convert each column like its first values (11)", "boolean"),
+			("open-files"       , "", "Number of files split actions keep open (14)"  , "value")
 		]
 		
 		# Flags used: a, c, d, e, h, i, l, o, q, s, v, H, V
@@ -1065,6 +3389,38 @@ class CLI(BaseCLI):
 		print("(3) Use {f} (filename) and {e} (extension) for variable output filenames")
 		print("    `--output {f}{e}` will update files in-place")
 		print("    `--output {f}-out{e}` will create individual outputs")
+		print("(4) csv (default, fastest) or python (reference implementation), analyze and")
+		print("    sql-import also accept numpy (checks values in batches, requires NumPy),")
+		print("    as do delim-to-fixed and fixed-to-delim (converts columns in batches)")
+		print("(5) Default is {}, use 0 to disable progress updates".format(ProgressTimer.interval))
+		print("(6) Default is 1, use 0 for one per CPU")
+		print("    Multiple inputs with individual outputs are processed concurrently")
+		print("    analyze, filter, remove-columns, repair, replace-pattern, replace-value,")
+		print("    sql-import and sql-prepare split large files into chunks that are processed")
+		print("    in parallel, as does fixed-to-delim with single byte encodings (15)")
+		print("(7) Distinct values are estimated and median and frequent values are added")
+		print("(8) Read records from random parts of each file until every column's type and")
+		print("    length bounds are unchanged for this many records")
+		print("(9) The analysis of each input file is saved next to it in a .profile file")
+		print("    Files that have changed other than by appending records are analyzed again")
+		print("(10) Default is {}, use 0 to disable caching, the cache is loaded from and".format(ValueCache.size))
+		print("     saved to the cache file so later runs start with the same values, other")
+		print("     than dates with words that may be relative to the time, i.e., 3 days ago")
+		print("(11) sql-prepare learns how each column converts from the values with digits")
+		print("     in the first {} records, then converts the rest the same way, i.e., with".format(ConversionPlan.sample_size))
+		print("     one date format, columns of text are left as they are")
+		print("(12) One value per line, filter keeps records with one of the values in the")
+		print("     column instead of matching a pattern, files of more than {:,} values".format(BasicAction.key_limit))
+		print("     use a Bloom filter, which also keeps about 0.1% of other records")
+		print("(13) One action per line with its options as on the command line, i.e.:")
+		print("     remove-columns --columns 2-3")
+		print("     Each record goes through every action in order and is only read, parsed")
+		print("     and written once, columns are numbered as output by the previous action")
+		print("(14) Default is {}, the least recently written file is closed when another".format(WriterPool.size))
+		print("     is needed and reopened to append to it")
+		print("(15) fixed-to-delim converts up to --lines records after the skipped ones")
+		print("     With single byte encodings, i.e., cp1252, records are found by their byte")
+		print("     offsets, skipped records are only counted")
 		
 		# Print action info
 		print("")
@@ -1073,6 +3429,8 @@ class CLI(BaseCLI):
 		print("  analyze - analyze a file and output a summary of its contents")
 		print("    dart -a analyze -i a.csv -o b.csv --headers")
 		print("    dart -a analyze -i a.csv -o b.csv --headers --lines 1000")
+		print("    dart -a analyze -i a.csv -o b.csv --headers --sketch")
+		print("    dart -a analyze -i a.csv -o b.csv --headers --profile")
 		print("")
 		
 		print("  combine - combine multiple files")
@@ -1086,10 +3444,13 @@ class CLI(BaseCLI):
 		print("  filter - filter records based on a column's value")
 		print("    dart -a filter --column 1 --pattern {q}^A{q} -i a.csv -o b.csv".format(q=q))
 		print("    dart -a filter --column 1 --pattern {q}^A{q} -i a.csv -o b.csv --invert".format(q=q))
+		print("    dart -a filter --column 1 --keys ids.txt -i a.csv -o b.csv")
+		print("    dart -a filter --column 1 --pattern {q}^A{q} --pipeline stages.txt -i a.csv -o b.csv".format(q=q))
 		print("")
 		
 		print("  fixed-to-delim - covert a fixed width file to a delimited file")
 		print("    dart -a fixed-to-delim --definition fixed.def -i a.txt -o b.csv")
+		print("    dart -a fixed-to-delim --definition fixed.def -i a.txt -o b.csv --skip 1000 --lines 10")
 		print("")
 		
 		print("  head - output a specified number of lines from the beginning of a file")
@@ -1115,19 +3476,28 @@ class CLI(BaseCLI):
 		
 		print("  split-lines - split one file into many based on number of lines")
 		print("    dart -a split-lines --lines 500 -i a.csv")
+		print("    dart -a split-lines --parts 8 -i a.csv")
 		print("")
 		
 		print("  split-value - split one file into many based on a column's value")
 		print("    dart -a split-value --column 1 -i a.csv")
+		print("    dart -a split-value --column 1 -i a.csv --open-files 256")
 		print("")
 		
 		print("  sql-import - create SQL CREATE TABLE and LOAD DATA statements")
 		print("    dart -a sql-import -i a.csv -o b.sql --headers")
 		print("    dart -a sql-import -i a.csv -o b.sql --headers --lines 1000")
+		print("    dart -a sql-import -i a.csv -o b.sql --headers --sample 10000")
 		print("")
 		
 		print("  sql-prepare - standardize date/number formatting for SQL LOAD DATA statements")
 		print("    dart -a sql-prepare -i a.csv -o b.csv --headers")
+		print("    dart -a sql-prepare -i a.csv -o b.csv --headers --cache-file values.cache")
+		print("    dart -a sql-prepare -i a.csv -o b.csv --headers --plan")
+		print("")
+		
+		print("  tail - output a specified number of lines from the end of a file")
+		print("    dart -a tail --lines 10 -i a.csv -o b.csv")
 		print("")
 		
 	def get_action(self, inputs):
@@ -1182,6 +3552,7 @@ class GUI(BaseGUI):
  \u2022 Split Value - split one file into many based on a column's value
  \u2022 SQL Import - create SQL CREATE TABLE and LOAD DATA statements
  \u2022 SQL Prepare - standardize date/number formatting for SQL LOAD DATA statements
+ \u2022 Tail - output a specified number of lines from the end of a file
 
 """, "normal")
 		
@@ -1192,7 +3563,10 @@ class GUI(BaseGUI):
  \u2022 Find - value/pattern to find
  \u2022 Replace - replacement value/pattern
  \u2022 Invert? - invert match
+ \u2022 Keys - file of values to match instead of a pattern, one per line
  \u2022 Lines - number of lines
+ \u2022 Parts - number of parts of about the same size to split into instead of a number of lines
+ \u2022 Skip - number of records to skip before the ones converted from a fixed width file
  \u2022 Pattern - regular expression
 
 """, "normal")
@@ -1228,18 +3602,19 @@ class GUI(BaseGUI):
 			"":["action"],
 			
 			"Combine"        :["action", "input", "input-browse", "output", "output-browse",                               "encoding", "headers", "submit"],
-			"Filter"         :["action", "input", "input-browse", "output", "output-browse", "delim", "enclose", "escape", "encoding", "headers", "submit", "column", "invert", "pattern"],
+			"Filter"         :["action", "input", "input-browse", "output", "output-browse", "delim", "enclose", "escape", "encoding", "headers", "submit", "column", "invert", "pattern", "keys", "keys-browse"],
 			"Head"           :["action", "input", "input-browse", "output", "output-browse",                               "encoding", "headers", "submit", "lines"],
 			"Remove Columns" :["action", "input", "input-browse", "output", "output-browse", "delim", "enclose", "escape", "encoding", "headers", "submit", "columns", "invert"],
 			"Repair"         :["action", "input", "input-browse", "output", "output-browse", "delim", "enclose", "escape", "encoding", "headers", "submit"],
 			"Replace Pattern":["action", "input", "input-browse", "output", "output-browse", "delim", "enclose", "escape", "encoding", "headers", "submit", "column", "find", "replace"],
 			"Replace Value"  :["action", "input", "input-browse", "output", "output-browse", "delim", "enclose", "escape", "encoding", "headers", "submit", "column", "find", "replace"],
 			"SQL Prepare"    :["action", "input", "input-browse", "output", "output-browse", "delim", "enclose", "escape", "encoding", "headers", "submit"],
+			"Tail"           :["action", "input", "input-browse", "output", "output-browse",                               "encoding", "headers", "submit", "lines"],
 			
 			"Delim to Fixed":["action", "input", "input-browse", "output", "output-browse", "delim", "enclose", "escape", "encoding", "headers", "submit", "definition", "definition-browse"],
-			"Fixed to Delim":["action", "input", "input-browse", "output", "output-browse", "delim", "enclose", "escape", "encoding", "headers", "submit", "definition", "definition-browse"],
+			"Fixed to Delim":["action", "input", "input-browse", "output", "output-browse", "delim", "enclose", "escape", "encoding", "headers", "submit", "definition", "definition-browse", "lines", "skip"],
 			
-			"Split Lines":["action", "input", "input-browse",                               "encoding", "headers", "submit", "lines"],
+			"Split Lines":["action", "input", "input-browse",                               "encoding", "headers", "submit", "lines", "parts"],
 			"Split Value":["action", "input", "input-browse", "delim", "enclose", "escape", "encoding", "headers", "submit", "column"],
 			
 			"Analyze"   :["action", "input", "input-browse", "output", "output-browse", "delim", "enclose", "escape", "encoding", "headers", "submit", "lines"],
@@ -1255,7 +3630,7 @@ class GUI(BaseGUI):
 	def create_widgets(self):	
 		"""Create the widgets."""
 		
-		actions = ("", "Analyze", "Combine", "Delim to Fixed", "Filter", "Fixed to Delim", "Head", "Remove Columns", "Repair", "Replace Pattern", "Replace Value", "Split Lines", "Split Value", "SQL Import", "SQL Prepare")
+		actions = ("", "Analyze", "Combine", "Delim to Fixed", "Filter", "Fixed to Delim", "Head", "Remove Columns", "Repair", "Replace Pattern", "Replace Value", "Split Lines", "Split Value", "SQL Import", "SQL Prepare", "Tail")
 		self.create_combobox(self, "action", "Action", actions)
 		self.widgets["action"].bind("<<ComboboxSelected>>", self.enable_widgets)
 		
@@ -1265,7 +3640,10 @@ class GUI(BaseGUI):
 		self.create_entry   (self, "find"      , "Find"   )
 		self.create_entry   (self, "replace"   , "Replace")
 		self.create_entry   (self, "lines"     , "Lines"  )
+		self.create_entry   (self, "parts"     , "Parts"  )
+		self.create_entry   (self, "skip"      , "Skip"   )
 		self.create_entry   (self, "pattern"   , "Pattern")
+		self.create_browse  (self, "keys"      , "Keys", self.get_input, filetypes=[("All Files", ".*")])
 		
 		self.create_browse  (self, "input"   , "Input"    , self.get_inputs, filetypes=[("All Files", ".*")])
 		self.create_browse  (self, "output"  , "Output"   , self.get_output, filetypes=[("All Files", ".*")])
@@ -1300,4 +3678,7 @@ class GUI(BaseGUI):
 		self.disable_widgets()
 		self.widgets["action"].config(state = "readonly")
 
-if __name__ == "__main__": main(program, Configuration, CLI, GUI)
+if __name__ == "__main__":
+	# Worker processes of the frozen Windows executables run their task instead of starting the program again
+	multiprocessing.freeze_support()
+	main(program, Configuration, CLI, GUI)
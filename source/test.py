@@ -22,8 +22,11 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 #############################################################################################################################
 
+import json
 import os
+import random
 import tempfile
+import time
 from datetime import datetime
 from inspect import cleandoc
 from dart import *
@@ -42,18 +45,22 @@ def test_combine(inputs):
 	for test_val_1, test_desc_1 in test_cases_1.items():
 		inputs["headers"] = test_val_1
 		
-		description = [inputs["action"], test_desc_1]
-		
-		contents_input = "foo,bar\nbar,foo\n"
-		contents_output = contents_input * len(inputs["input"])
-		if inputs["headers"]:
-			h = "field1,field2\n"
-			contents_input = h + contents_input
-			contents_output = h + contents_output
-		
-		message = "Processed 6 records sucessfully"
-		
-		test_helper(", ".join(description), BasicAction, inputs, contents_input, contents_output, message)
+		# Test files that are copied as they are and files that are read line by line
+		test_cases_2 = {"\n":"copied", "\r\n":"read"}
+		for test_val_2, test_desc_2 in test_cases_2.items():
+			description = [inputs["action"], test_desc_1, test_desc_2]
+			
+			contents_input = "foo,bar\nbar,foo\n"
+			contents_output = contents_input * len(inputs["input"])
+			if inputs["headers"]:
+				h = "field1,field2\n"
+				contents_input = h + contents_input
+				contents_output = h + contents_output
+			contents_input = contents_input.replace("\n", test_val_2)
+			
+			message = "Processed 6 records sucessfully"
+			
+			test_helper(", ".join(description), BasicAction, inputs, contents_input, contents_output, message)
 	
 def test_filter(inputs):
 	"""Test filter action."""
@@ -94,6 +101,103 @@ def test_filter(inputs):
 				
 				test_helper(", ".join(description), BasicAction, inputs, contents_input, contents_output, message)
 	
+def test_filter_keys(inputs):
+	"""Test filter action with a file of keys."""
+	
+	inputs.update({
+		"action" :"filter",
+		"column" :1,
+		"pattern":"",
+		"keys"   :"{}/test-keys.txt".format(tempfile.gettempdir()),
+		"headers":True,
+		"input"  :["{tmp}/test-input-file1.csv"],
+		"output" :"{tmp}/test-output.csv"
+	})
+	
+	writeall("foo\n\n \t \n baz \n", inputs["keys"], inputs["encoding"])
+	
+	key_limit = BasicAction.key_limit
+	try:
+		# Test a set and a Bloom filter
+		test_cases_1 = {key_limit:"set", 0:"bloom filter"}
+		for test_val_1, test_desc_1 in test_cases_1.items():
+			BasicAction.key_limit = test_val_1
+			
+			# Test without and with invert
+			test_cases_2 = {False:"not inverted", True:"inverted"}
+			for test_val_2, test_desc_2 in test_cases_2.items():
+				inputs["invert"] = test_val_2
+				
+				description = [inputs["action"], "keys", test_desc_1, test_desc_2]
+				
+				# Lines of only whitespace in the keys file don't match empty values
+				contents_input = "field1,field2\nfoo,bar\nbar,foo\nbaz,1\n,2\n"
+				contents_output = "field1,field2\nfoo,bar\nbaz,1\n" if not inputs["invert"] else "field1,field2\nbar,foo\n,2\n"
+				
+				test_helper(", ".join(description), BasicAction, inputs, contents_input, contents_output, "Processed 4 records sucessfully")
+		
+		# Test a pipeline filtering with a second keys file
+		BasicAction.key_limit = key_limit
+		inputs.update({"invert":False, "pipeline":"{}/test-pipeline.txt".format(tempfile.gettempdir())})
+		keys = "{}/test-keys2.txt".format(tempfile.gettempdir())
+		writeall("1\n", keys, inputs["encoding"])
+		writeall("filter --column 2 --keys {}\n".format(keys), inputs["pipeline"], inputs["encoding"])
+		chunk_size = BasicAction.chunk_size
+		try:
+			contents_input = "field1,field2\n" + "foo,bar\nbaz,1\nfoo,1\n" * 4
+			
+			# Test in one process and split into chunks, where each worker process loads both files
+			test_cases_1 = {1:"single process", 2:"jobs"}
+			for test_val_1, test_desc_1 in test_cases_1.items():
+				inputs["jobs"] = test_val_1
+				BasicAction.chunk_size = 16 if test_val_1 > 1 else chunk_size
+				test_helper("filter, keys, pipeline, " + test_desc_1, BasicAction, inputs, contents_input, "field1,field2\n" + "baz,1\nfoo,1\n" * 4, "Processed 12 records sucessfully")
+			
+			# Test that a changed keys file is loaded again
+			writeall("bar\n", keys, inputs["encoding"])
+			test_helper("filter, keys, pipeline, changed", BasicAction, inputs, contents_input, "field1,field2\n" + "foo,bar\n" * 4, "Processed 12 records sucessfully")
+		finally:
+			BasicAction.chunk_size = chunk_size
+			os.remove(keys)
+			os.remove(inputs["pipeline"])
+	finally:
+		BasicAction.key_limit = key_limit
+		os.remove(inputs["keys"])
+
+def test_pipeline(inputs):
+	"""Test actions with a pipeline of actions after them."""
+	
+	inputs.update({
+		"action"  :"filter",
+		"column"  :1,
+		"pattern" :"^(foo|baz)$",
+		"invert"  :False,
+		"pipeline":"{}/test-pipeline.txt".format(tempfile.gettempdir()),
+		"headers" :True,
+		"input"   :["{tmp}/test-input-file1.csv"],
+		"output"  :"{tmp}/test-output.csv"
+	})
+	
+	writeall('# Clean up the matches\nremove-columns --columns 2\n\nreplace-value --column 1 --find o --replace 0\nfilter --column 2 --pattern "\\d"\n', inputs["pipeline"], inputs["encoding"])
+	
+	chunk_size = BasicAction.chunk_size
+	try:
+		# Test in one process and split into chunks
+		test_cases_1 = {1:"single process", 2:"jobs"}
+		for test_val_1, test_desc_1 in test_cases_1.items():
+			inputs["jobs"] = test_val_1
+			BasicAction.chunk_size = 16 if test_val_1 > 1 else chunk_size
+			
+			description = [inputs["action"], "pipeline", test_desc_1]
+			
+			contents_input = "field1,field2,field3\nfoo,x,1\nbar,y,2\nbaz,z,a\nfoo,w,3\n"
+			contents_output = '"field1","field3"\n"f00","1"\n"f00","3"\n'
+			
+			test_helper(", ".join(description), BasicAction, inputs, contents_input, contents_output, "Processed 4 records sucessfully")
+	finally:
+		BasicAction.chunk_size = chunk_size
+		os.remove(inputs["pipeline"])
+
 def test_head(inputs):
 	"""Test head action."""
 	
@@ -129,6 +233,46 @@ def test_head(inputs):
 			
 			test_helper(", ".join(description), BasicAction, inputs, contents_input, contents_output, message)
 	
+def test_tail(inputs):
+	"""Test tail action."""
+	
+	inputs.update({
+		"action":"tail",
+		"lines" :5,
+		"input" :["{tmp}/test-input-file1.csv", "{tmp}/test-input-file2.csv", "{tmp}/test-input-file3.csv"]
+	})
+	
+	# Test with and without headers
+	test_cases_1 = {True:"headers", False:"no headers"}
+	for test_val_1, test_desc_1 in test_cases_1.items():
+		inputs["headers"] = test_val_1
+		
+		# Test single, multiple and in-place outputs
+		test_cases_2 = {"test-output.csv":"single", "{{f}}-out{{e}}":"multiple", "{{f}}{{e}}":"in-place"}
+		for test_val_2, test_desc_2 in test_cases_2.items():
+			inputs["output"] = "{tmp}/" + test_val_2
+			
+			# Test files read backwards from the end and files read from the start
+			test_cases_3 = {"utf-8":"seek", "utf-16":"read"}
+			for test_val_3, test_desc_3 in test_cases_3.items():
+				inputs["encoding"] = test_val_3
+				
+				description = [inputs["action"], test_desc_1, test_desc_2, test_desc_3]
+				
+				# More than the first block read from the end, with a blank line at the end
+				rows = 20000
+				contents_input = "".join("{},bar\n".format(k) for k in range(rows)) + "\n"
+				contents_output = "".join("{},bar\n".format(k) for k in range(rows - inputs["lines"], rows))
+				if test_desc_2 == "single": contents_output = contents_output * len(inputs["input"])
+				if inputs["headers"]:
+					h = "field1,field2\n"
+					contents_input = h + contents_input
+					contents_output = h + contents_output
+				
+				message = "Processed 15 records sucessfully"
+				
+				test_helper(", ".join(description), BasicAction, inputs, contents_input, contents_output, message)
+	
 def test_remove_columns(inputs):
 	"""Test remove columns action."""
 	
@@ -342,6 +486,145 @@ def test_fixed_to_delim(inputs):
 	finally:
 		os.remove(inputs["definition"])
 
+def test_fixed_window(inputs):
+	"""Test fixed to delim action with skipped records and a number of lines, finding records by their byte offsets or reading every line."""
+	
+	inputs.update({
+		"action"    :"fixed-to-delim",
+		"definition":"{tmp}/fixed.def".format(tmp=tempfile.gettempdir()),
+		"input"     :["{tmp}/test-input-file1.txt"],
+		"output"    :"{tmp}/test-output.csv",
+		"headers"   :True
+	})
+	
+	records = ["{:03d}\u00e9 ".format(k) for k in range(50)]
+	
+	writeall("3\n2\n", inputs["definition"])
+	chunk_size = FixedAction.chunk_size
+	try:
+		# Small ranges of records so several are converted by each worker process
+		FixedAction.chunk_size = 16
+		
+		# Test a single byte encoding, and one whose records can't be found by their byte offsets
+		test_cases_1 = {"cp1252":"offsets", "utf-8":"lines read"}
+		for test_val_1, test_desc_1 in test_cases_1.items():
+			inputs["encoding"] = test_val_1
+			
+			# Test with and without worker processes
+			test_cases_2 = {"1":"one job", "2":"two jobs"}
+			for test_val_2, test_desc_2 in test_cases_2.items():
+				inputs["jobs"] = test_val_2
+				
+				# Test every record, a window, one record and a window past the end
+				test_cases_3 = {("", ""):"all", ("10", "5"):"window", ("0", "1"):"first", ("48", "10"):"end"}
+				for test_val_3, test_desc_3 in test_cases_3.items():
+					(inputs["skip"], inputs["lines"]) = test_val_3
+					
+					description = [inputs["action"], test_desc_1, test_desc_2, test_desc_3]
+					
+					window = records[int(test_val_3[0] or 0):][:int(test_val_3[1] or len(records))]
+					contents_input = "".join(record + "\r\n" for record in ["field"] + records)
+					contents_output = '"fie","ld"\n' + "".join('"{}","{}"\n'.format(record[:3], record[3:].strip()) for record in window)
+					
+					message = "Processed {} records sucessfully".format(len(window))
+					
+					test_helper(", ".join(description), FixedAction, inputs, contents_input, contents_output, message)
+				
+				# Test skipped lines that aren't one record each, which are counted the same way as when every line is read, blank lines that
+				# take as many bytes as two records included
+				test_cases_4 = {tuple(records[:3] + [""] * 7 + records[3:]):"blank lines", tuple(records[:3] + [records[3] + records[4]] + records[5:]):"double length"}
+				for test_val_4, test_desc_4 in test_cases_4.items():
+					(inputs["skip"], inputs["lines"]) = ("5", "2")
+					
+					description = [inputs["action"], test_desc_1, test_desc_2, "skipped " + test_desc_4]
+					
+					window = [line for line in test_val_4 if line != ""][5:7]
+					contents_input = "".join(line + "\r\n" for line in ("field",) + test_val_4)
+					contents_output = '"fie","ld"\n' + "".join('"{}","{}"\n'.format(record[:3], record[3:].strip()) for record in window)
+					
+					message = "Processed {} records sucessfully".format(len(window))
+					
+					test_helper(", ".join(description), FixedAction, inputs, contents_input, contents_output, message)
+				
+				# Test that a line of the wrong length is reported with its line number
+				print2("Testing: {} ".format(", ".join([inputs["action"], test_desc_1, test_desc_2, "short line"])))
+				
+				filename = inputs["input"][0].format(tmp=tempfile.gettempdir())
+				writeall("".join(record + "\n" for record in ["field"] + records[:30] + ["030\u00e9"] + records[31:]), filename, inputs["encoding"])
+				fixed = FixedAction(dict(inputs, input=[filename], output=inputs["output"].format(tmp=tempfile.gettempdir()), skip="", lines=""))
+				fixed.standardize()
+				try:
+					fixed.process_files()
+					print("FAIL\nNo error")
+				except ValueError as e:
+					expected = "Line #31 is not the required 5 characters long. It is 4 characters long."
+					if str(e) != expected:
+						print("FAIL\nExpected: {}\nActual: {}".format(expected, e))
+					else:
+						print("PASS")
+				finally:
+					for f in [filename, fixed.inputs["output"]]:
+						if os.path.exists(f): os.remove(f)
+	finally:
+		FixedAction.chunk_size = chunk_size
+		os.remove(inputs["definition"])
+
+def test_fixed_batches(inputs):
+	"""Test that the numpy engine converts fixed width files in batches the same way as the python engine."""
+	
+	inputs.update({
+		"definition":"{tmp}/fixed.def".format(tmp=tempfile.gettempdir()),
+		"headers"   :False
+	})
+	filenames = ["{tmp}/test-input-file.txt".format(tmp=tempfile.gettempdir()), "{tmp}/test-output.csv".format(tmp=tempfile.gettempdir()), "{tmp}/test-output.txt".format(tmp=tempfile.gettempdir())]
+	
+	# Build random records from the characters that matter to the conversions, including the ones NumPy can't hold
+	rand = random.Random(0)
+	lines = ["".join(rand.choice('ab \t",\\\x1c\xa0\u00e9\U0001F600') for y in range(9)) for x in range(3000)]
+	lines[2000] = lines[2000].replace("a", "\0")
+	
+	writeall("3\n2\n4\n", inputs["definition"])
+	try:
+		# Test every line the required length, one that isn't, and a short line followed by a long one the batch's length doesn't show
+		test_cases_1 = {(9, 9):"valid", (8, 9):"short line", (8, 10):"uneven lines"}
+		for test_val_1, test_desc_1 in test_cases_1.items():
+			writeall("\n".join(lines[:2500] + [lines[2500][:test_val_1[0]], (lines[2501] + "x")[:test_val_1[1]]] + lines[2502:]) + "\n", filenames[0], inputs["encoding"])
+			
+			# Convert to delimited and back
+			test_cases_2 = {("fixed-to-delim", 0, 1):"fixed-to-delim", ("delim-to-fixed", 1, 2):"delim-to-fixed"}
+			for test_val_2, test_desc_2 in test_cases_2.items():
+				(action, source, target) = test_val_2
+				
+				description = ["fixed", "batches", test_desc_1, test_desc_2]
+				
+				print2("Testing: {} ".format(", ".join(description)))
+				
+				results = []
+				batch_size = FixedAction.batch_size
+				try:
+					FixedAction.batch_size = 7
+					for engine in ["python", "numpy"]:
+						fixed = FixedAction(dict(inputs, action=action, engine=engine, input=filenames[source], output=filenames[target]))
+						fixed.standardize()
+						try:
+							fixed.process_files()
+							results.append(readall(filenames[target], inputs["encoding"]))
+						except ValueError as e:
+							results.append(str(e))
+				finally:
+					FixedAction.batch_size = batch_size
+				
+				if results[0] != results[1]:
+					print("FAIL\nExpected: {!r}\nActual: {!r}".format(results[0][:200], results[1][:200]))
+				else:
+					print("PASS")
+				
+				if test_desc_1 != "valid": break
+	finally:
+		os.remove(inputs["definition"])
+		for filename in filenames:
+			if os.path.exists(filename): os.remove(filename)
+
 def test_split_lines(inputs):
 	"""Test split line action."""
 	
@@ -356,23 +639,62 @@ def test_split_lines(inputs):
 	for test_val_1, test_desc_1 in test_cases_1.items():
 		inputs["headers"] = test_val_1
 		
-		description = [inputs["action"], test_desc_1]
-		
-		d = "foo,bar\n"
-		rows = 10
-		contents_input = d * rows
-		contents_output = d * inputs["lines"]
-		if inputs["headers"]:
-			h = "field1,field2\n"
-			contents_input = h + contents_input
-			contents_output = h + contents_output
-		
-		contents_outputs = {}
-		for i in range(1, int(rows/inputs["lines"])+1): contents_outputs["{{tmp}}/test-input-file-{}.csv".format(i)] = contents_output
-		
-		message = "Processed 10 records sucessfully"
+		# Test files that are copied as they are and files that are read line by line
+		test_cases_2 = {"\n":"copied", "\r\n":"read"}
+		for test_val_2, test_desc_2 in test_cases_2.items():
+			description = [inputs["action"], test_desc_1, test_desc_2]
+			
+			d = "foo,bar\n"
+			rows = 10
+			contents_input = (d * rows).replace("\n", test_val_2)
+			contents_output = d * inputs["lines"]
+			if inputs["headers"]:
+				h = "field1,field2\n"
+				contents_input = h.replace("\n", test_val_2) + contents_input
+				contents_output = h + contents_output
+			
+			contents_outputs = {}
+			for i in range(1, int(rows/inputs["lines"])+1): contents_outputs["{{tmp}}/test-input-file-{}.csv".format(i)] = contents_output
+			
+			message = "Processed 10 records sucessfully"
+			
+			test_helper_split(", ".join(description), inputs, contents_input, contents_outputs, message)
+
+def test_split_parts(inputs):
+	"""Test split line action with a number of parts."""
+	
+	inputs.update({
+		"action":"split-lines",
+		"lines" :"",
+		"parts" :3,
+		"input" :"{tmp}/test-input-file.csv"
+	})
+	
+	# Test with and without headers
+	test_cases_1 = {True:"headers", False:"no headers"}
+	for test_val_1, test_desc_1 in test_cases_1.items():
+		inputs["headers"] = test_val_1
 		
-		test_helper_split(", ".join(description), inputs, contents_input, contents_outputs, message)
+		# Test files that are copied as they are and files that are read line by line
+		test_cases_2 = {"\n":"copied", "\r\n":"read"}
+		for test_val_2, test_desc_2 in test_cases_2.items():
+			description = [inputs["action"], "parts", test_desc_1, test_desc_2]
+			
+			# Lines start every 8 bytes (9 with \r\n), so parts start on the 5th and 8th lines
+			d = "foo,bar\n"
+			rows = 10
+			contents_input = (d * rows).replace("\n", test_val_2)
+			h = ""
+			if inputs["headers"]:
+				h = "field1,field2\n"
+				contents_input = h.replace("\n", test_val_2) + contents_input
+			
+			contents_outputs = {}
+			for (i, lines) in enumerate([4, 3, 3]): contents_outputs["{{tmp}}/test-input-file-{}.csv".format(i + 1)] = h + d * lines
+			
+			message = "Processed 10 records sucessfully"
+			
+			test_helper_split(", ".join(description), inputs, contents_input, contents_outputs, message)
 
 def test_split_value(inputs):
 	"""Test split value action."""
@@ -388,22 +710,27 @@ def test_split_value(inputs):
 	for test_val_1, test_desc_1 in test_cases_1.items():
 		inputs["headers"] = test_val_1
 		
-		description = [inputs["action"], test_desc_1]
-		
-		rows = 5
-		contents_input = "foo,bar\nbar,foo\n" * rows
-		contents_outputs = {}
-		contents_outputs["{tmp}/test-input-file-foo.csv"] = 'foo,bar\n' * rows
-		contents_outputs["{tmp}/test-input-file-bar.csv"] = 'bar,foo\n' * rows
-		if inputs["headers"]:
-			h = "field1,field2\n"
-			contents_input = h + contents_input
-			contents_outputs["{tmp}/test-input-file-foo.csv"] = h + contents_outputs["{tmp}/test-input-file-foo.csv"]
-			contents_outputs["{tmp}/test-input-file-bar.csv"] = h + contents_outputs["{tmp}/test-input-file-bar.csv"]
-		
-		message = "Processed 10 records sucessfully"
-		
-		test_helper_split(", ".join(description), inputs, contents_input, contents_outputs, message)
+		# Test with every output file open and with files closed and reopened for each record
+		test_cases_2 = {"":"open files", 1:"one open file"}
+		for test_val_2, test_desc_2 in test_cases_2.items():
+			inputs["open-files"] = test_val_2
+			
+			description = [inputs["action"], test_desc_1, test_desc_2]
+			
+			rows = 5
+			contents_input = "foo,bar\nbar,foo\n" * rows
+			contents_outputs = {}
+			contents_outputs["{tmp}/test-input-file-foo.csv"] = 'foo,bar\n' * rows
+			contents_outputs["{tmp}/test-input-file-bar.csv"] = 'bar,foo\n' * rows
+			if inputs["headers"]:
+				h = "field1,field2\n"
+				contents_input = h + contents_input
+				contents_outputs["{tmp}/test-input-file-foo.csv"] = h + contents_outputs["{tmp}/test-input-file-foo.csv"]
+				contents_outputs["{tmp}/test-input-file-bar.csv"] = h + contents_outputs["{tmp}/test-input-file-bar.csv"]
+			
+			message = "Processed 10 records sucessfully"
+			
+			test_helper_split(", ".join(description), inputs, contents_input, contents_outputs, message)
 
 def test_analyze(inputs):
 	"""Test analyze action."""
@@ -421,6 +748,7 @@ def test_analyze(inputs):
 		inputs["headers"] = test_val_1
 		
 		description = [inputs["action"], test_desc_1]
+		if "engine" in inputs: description.append(inputs["engine"])
 		
 		contents_input = cleandoc('''
 			Alice,foobar,01234,123,123,07/16/17,13:00,2017-07-16 15:00:00,1
@@ -450,6 +778,228 @@ def test_analyze(inputs):
 		
 		test_helper(", ".join(description), AnalyzeAction, inputs, contents_input, contents_output, message)
 	
+def test_analyze_sketch(inputs):
+	"""Test analyze action with sketches."""
+	
+	inputs.update({
+		"action" :"analyze",
+		"lines"  :0,
+		"sketch" :True,
+		"headers":True,
+		"input"  :["{tmp}/test-input-file1.csv"],
+		"output" :"{{f}}-out{{e}}"
+	})
+	
+	description = [inputs["action"], "sketch"]
+	
+	contents_input = cleandoc('''
+		Name,Integer,Decimal,Boolean
+		Alice,123,123,1
+		Bob,5,123.45,0
+		Bob,40,,1
+	''')
+	
+	contents_output = cleandoc('''
+		"Column Name","Name","Integer","Decimal","Boolean"
+		"Data Type","Text","Integer","Decimal","Boolean"
+		"Minimum Length","3","1","3","1"
+		"Average Length","3.7","2.0","4.5","1.0"
+		"Maximum Length","5","3","6","1"
+		"Minimum Value","Alice","5","123.0","0"
+		"Average Value","","56.0","82.14999999999999","0.7"
+		"Maximum Value","Bob","123","123.45","1"
+		"Empty Values","0","0","1","0"
+		"Distinct Values","2","3","3","2"
+		"Total Values","3","3","3","3"
+		"Median Length","3","2","6","1"
+		"Median Value","","40","123.45","1"
+		"Frequent Values","Bob (2); Alice (1)","123 (1); 40 (1); 5 (1)","123 (1); 123.45 (1)","1 (2); 0 (1)"
+	''')
+	
+	test_helper(", ".join(description), AnalyzeAction, inputs, contents_input, contents_output, "Processed 3 records sucessfully")
+
+def test_analyze_sample(inputs):
+	"""Test analyze action with sampling."""
+	
+	inputs.update({
+		"action" :"analyze",
+		"lines"  :0,
+		"sample" :50,
+		"headers":True,
+		"input"  :["{tmp}/test-input-file1.csv"],
+		"output" :"{{f}}-out{{e}}"
+	})
+	
+	description = [inputs["action"], "sample"]
+	
+	# Values only become text near the end of the file
+	contents_input = "Name,Value\n" + "\n".join("row{},{}".format(x, x if x < 900 else "x{}".format(x)) for x in range(1000))
+	
+	contents_output = cleandoc('''
+		"Column Name","Name","Value"
+		"Data Type","Text","Text"
+		"Minimum Length","4","1"
+		"Average Length","5.9","3.0"
+		"Maximum Length","6","4"
+		"Minimum Value","row0","0"
+		"Average Value","",""
+		"Maximum Value","row968","x968"
+		"Empty Values","0","0"
+		"Distinct Values","87","87"
+		"Total Values","89","89"
+	''')
+	
+	# Use tiny samples so the file isn't read in order
+	sample_size = SampledDataReader.sample_size
+	SampledDataReader.sample_size = 32
+	try:
+		test_helper(", ".join(description), AnalyzeAction, inputs, contents_input, contents_output, "Sampled 89 records sucessfully")
+	finally:
+		SampledDataReader.sample_size = sample_size
+
+def test_analyze_options(inputs):
+	"""Test that options only analyze and sql-import use are rejected for other actions, and that small files aren't sampled."""
+	
+	inputs.update({
+		"action" :"filter",
+		"column" :1,
+		"columns":"",
+		"pattern":"foo",
+		"headers":True,
+		"input"  :["{}/test-input-file1.csv".format(tempfile.gettempdir())],
+		"output" :"{}/test-output.csv".format(tempfile.gettempdir())
+	})
+	
+	test_cases_1 = {("sample", 5):"Sample", ("sketch", True):"Sketch", ("profile", True):"Profile"}
+	for test_val_1, test_desc_1 in test_cases_1.items():
+		print2("Testing: filter, {} ".format(test_val_1[0]))
+		action = BasicAction(dict(inputs, **{test_val_1[0]:test_val_1[1]}))
+		try:
+			action.standardize()
+			action.validate()
+			print("FAIL\nNo error")
+		except ValueError as e:
+			expected = "{} can only be used with analyze or sql-import.".format(test_desc_1)
+			if expected not in str(e).split("\n"):
+				print("FAIL\nExpected: {}\nActual: {}".format(expected, e))
+			else:
+				print("PASS")
+	
+	# Small files are read in order so every record is processed
+	contents_input = "Name,Value\nfoo,1\nbar,2\n"
+	contents_output = cleandoc('''
+		"Column Name","Name","Value"
+		"Data Type","Text","Integer"
+		"Minimum Length","3","1"
+		"Average Length","3.0","1.0"
+		"Maximum Length","3","1"
+		"Minimum Value","bar","1"
+		"Average Value","","1.5"
+		"Maximum Value","foo","2"
+		"Empty Values","0","0"
+		"Distinct Values","2","2"
+		"Total Values","2","2"
+	''')
+	inputs.update({"action":"analyze", "lines":0, "sample":50, "input":["{tmp}/test-input-file1.csv"], "output":"{{f}}-out{{e}}"})
+	test_helper("analyze, sample, small file", AnalyzeAction, inputs, contents_input, contents_output, "Processed 2 records sucessfully")
+
+def test_analyze_jobs(inputs):
+	"""Test analyze action with chunks processed by worker processes."""
+	
+	inputs.update({
+		"action" :"analyze",
+		"lines"  :0,
+		"jobs"   :2,
+		"headers":True,
+		"input"  :["{tmp}/test-input-file1.csv"],
+		"output" :"{{f}}-out{{e}}"
+	})
+	
+	contents_input = cleandoc('''
+		Name,Decimal,Date,Time,Boolean
+		Alice,0.1,16 May 2017,13:00,1
+		Bob,0.2,16 may 2017,1:00,0
+		Carol,,17 May 2017,,1
+		Dave,0.3,15 May 2017,23:59:59,NULL
+		Eve,-0.0,15 may 2017,12:00,0
+	''')
+	
+	contents_output = cleandoc('''
+		"Column Name","Name","Decimal","Date","Time","Boolean"
+		"Data Type","Text","Decimal","Date","Text","Boolean"
+		"Minimum Length","3","3","11","4","1"
+		"Average Length","4.0","3.2","11.0","5.5","1.0"
+		"Maximum Length","5","4","11","8","1"
+		"Minimum Value","Alice","-0.0","15 May 2017","12:00","0"
+		"Average Value","","0.12000000000000002","","","0.5"
+		"Maximum Value","Eve","0.3","17 May 2017","23:59:59","1"
+		"Empty Values","0","1","0","1","1"
+		"Distinct Values","5","5","5","5","3"
+		"Total Values","5","5","5","5","5"
+	''')
+	
+	# Use tiny chunks so the file is split, decimals are added in the same order as in one process
+	chunk_size = AnalyzeAction.chunk_size
+	AnalyzeAction.chunk_size = 10
+	try:
+		test_cases_1 = {1:"single process", 2:"jobs"}
+		for test_val_1, test_desc_1 in test_cases_1.items():
+			inputs["jobs"] = test_val_1
+			test_helper(", ".join([inputs["action"], test_desc_1, "decimal sum"]), AnalyzeAction, inputs, contents_input, contents_output, "Processed 5 records sucessfully")
+	finally:
+		AnalyzeAction.chunk_size = chunk_size
+
+def test_analyze_profile(inputs):
+	"""Test analyze action with records appended after a profile was saved."""
+	
+	inputs.update({
+		"action" :"analyze",
+		"lines"  :0,
+		"headers":True,
+		"profile":True,
+		"input"  :["{tmp}/test-input-file1.csv"],
+		"output" :"{{f}}-out{{e}}"
+	})
+	
+	contents_start = cleandoc('''
+		Name,Decimal,Date,Time,Boolean
+		Alice,0.1,16 May 2017,13:00,1
+		Bob,0.2,16 may 2017,1:00,0
+		Carol,,17 May 2017,,1
+	''') + "\n"
+	
+	contents_appended = cleandoc('''
+		Dave,0.3,15 May 2017,23:59:59,NULL
+		Eve,-0.0,15 may 2017,12:00,0
+	''')
+	
+	contents_output = cleandoc('''
+		"Column Name","Name","Decimal","Date","Time","Boolean"
+		"Data Type","Text","Decimal","Date","Text","Boolean"
+		"Minimum Length","3","3","11","4","1"
+		"Average Length","4.0","3.2","11.0","5.5","1.0"
+		"Maximum Length","5","4","11","8","1"
+		"Minimum Value","Alice","-0.0","15 May 2017","12:00","0"
+		"Average Value","","0.12000000000000002","","","0.5"
+		"Maximum Value","Eve","0.3","17 May 2017","23:59:59","1"
+		"Empty Values","0","1","0","1","1"
+		"Distinct Values","5","5","5","5","3"
+		"Total Values","5","5","5","5","5"
+	''')
+	
+	# Save a profile of the start of the file
+	input_filename = inputs["input"][0].format(tmp=tempfile.gettempdir())
+	profile_filename = input_filename + AnalyzeAction.profile_extension
+	writeall(contents_start, input_filename, inputs["encoding"])
+	AnalyzeAction(dict(inputs, input=[input_filename], output="{f}-out{e}")).execute()
+	
+	try:
+		# Only the appended records are analyzed, then everything is again once the start of the file changes
+		test_helper("analyze, profile, appended", AnalyzeAction, inputs, contents_start + contents_appended, contents_output, "Processed 2 records sucessfully")
+		test_helper("analyze, profile, changed", AnalyzeAction, inputs, contents_start.replace("Bob", "Bea") + contents_appended, contents_output, "Processed 5 records sucessfully")
+	finally:
+		os.remove(profile_filename)
+
 def test_sql_import(inputs):
 	"""Test SQL import action."""
 	
@@ -466,6 +1016,7 @@ def test_sql_import(inputs):
 		inputs["headers"] = test_val_1
 		
 		description = [inputs["action"], test_desc_1]
+		if "engine" in inputs: description.append(inputs["engine"])
 		
 		contents_input = cleandoc('''
 			Alice,foobar,01234,123,123,07/16/17,13:00,2017-07-16 15:00:00,1
@@ -539,10 +1090,469 @@ def test_sql_prepare(inputs):
 				contents_input = "field1,field2,field3,field4,field5,field6,field7,field8\n" + contents_input
 				contents_output = '"field1","field2","field3","field4","field5","field6","field7","field8"\n' + contents_output
 			
-			message = "Processed 3 records sucessfully"
+			message = "Processed 3 records sucessfully (16 cache hits, 8 cache misses)"
 			
 			test_helper(", ".join(description), BasicAction, inputs, contents_input, contents_output, message)
 
+def test_sql_prepare_cache(inputs):
+	"""Test SQL prepare action with the cache saved between runs."""
+	
+	inputs.update({
+		"action"    :"sql-prepare",
+		"headers"   :False,
+		"cache"     :4,
+		"cache-file":"{}/test-values.cache".format(tempfile.gettempdir()),
+		"input"     :["{tmp}/test-input-file1.csv"],
+		"output"    :"{tmp}/test-output.csv"
+	})
+	
+	contents_input = "foo,01-01-23\nfoo,01-01-23\nbar,1%\n"
+	contents_output = '"foo","2023-01-01"\n"foo","2023-01-01"\n"bar","1"\n'
+	
+	try:
+		# The second run starts with every value from the first
+		test_helper("sql-prepare, cache", BasicAction, inputs, contents_input, contents_output, "Processed 3 records sucessfully (2 cache hits, 4 cache misses)")
+		test_helper("sql-prepare, cache file", BasicAction, inputs, contents_input, contents_output, "Processed 3 records sucessfully (6 cache hits, 0 cache misses)")
+		
+		# Dates relative to the current time aren't saved for later runs
+		print2("Testing: sql-prepare, cache file, relative dates ")
+		
+		filename = inputs["input"][0].format(tmp=tempfile.gettempdir())
+		writeall("foo,01-01-23\nfoo,3 days ago\n", filename, inputs["encoding"])
+		try:
+			action = BasicAction(dict(inputs, input=[filename], output=inputs["output"].format(tmp=tempfile.gettempdir())))
+			action.execute()
+			with open(inputs["cache-file"], mode="r", encoding="utf-8") as f: keys = [key for (key, value) in json.load(f)]
+			if ("3 days ago" in keys) or ("01-01-23" not in keys):
+				print("FAIL\nSaved keys: {}".format(keys))
+			else:
+				print("PASS")
+		finally:
+			for f in [filename, action.inputs["output"]]:
+				if os.path.exists(f): os.remove(f)
+	finally:
+		os.remove(inputs["cache-file"])
+
+def test_sql_prepare_plan(inputs):
+	"""Test SQL prepare action with conversion plans learned for each column."""
+	
+	inputs.update({
+		"action" :"sql-prepare",
+		"headers":False,
+		"plan"   :True,
+		"input"  :["{tmp}/test-input-file1.csv"],
+		"output" :"{tmp}/test-output.csv"
+	})
+	
+	# The last number isn't converted because the column was text in the sample, empty values are NULL in every kind of column
+	contents_input = "01/02/23,\"$1,000\",A1\n03/04/23,$2,B2\n05/06/23,(3),\"1,000\"\n,,\n"
+	contents_output = '"2023-01-02","1000","A1"\n"2023-03-04","2","B2"\n"2023-05-06","-3","1,000"\n"\\N","\\N","\\N"\n'
+	
+	sample_size = ConversionPlan.sample_size
+	ConversionPlan.sample_size = 2
+	try:
+		test_helper("sql-prepare, plan", BasicAction, inputs, contents_input, contents_output, "Processed 4 records sucessfully (2 cache hits, 7 cache misses)")
+	finally:
+		ConversionPlan.sample_size = sample_size
+	
+	# Plans are decided after the same records in one process and in chunks, even if few of them have digits, and a column that first
+	# appears after them is converted the generic way
+	contents_input = "Apt 5B,x\n" + "none,x\n" * 7 + "$1,x\n" * 8 + "$2,x,$3\n"
+	contents_output = '"Apt 5B","x"\n' + '"none","x"\n' * 7 + '"$1","x"\n' * 8 + '"$2","x","3"\n'
+	
+	(sample_size, chunk_size) = (ConversionPlan.sample_size, BasicAction.chunk_size)
+	(ConversionPlan.sample_size, BasicAction.chunk_size) = (5, 16)
+	try:
+		# Test in one process and split into chunks
+		test_cases_1 = {1:"single process", 2:"jobs"}
+		for test_val_1, test_desc_1 in test_cases_1.items():
+			inputs.update({"jobs":test_val_1, "cache":0})
+			test_helper("sql-prepare, plan, sample, " + test_desc_1, BasicAction, inputs, contents_input, contents_output, "Processed 17 records sucessfully")
+	finally:
+		(ConversionPlan.sample_size, BasicAction.chunk_size) = (sample_size, chunk_size)
+
+def test_jobs(inputs):
+	"""Test splitting files into chunks processed by worker processes."""
+	
+	inputs.update({
+		"action" :"replace-value",
+		"column" :1,
+		"find"   :"foo",
+		"replace":"bar",
+		"jobs"   :2,
+		"input"  :["{tmp}/test-input-file1.csv", "{tmp}/test-input-file2.csv", "{tmp}/test-input-file3.csv"]
+	})
+	
+	# Use tiny chunks so every file is split
+	chunk_size = BasicAction.chunk_size
+	BasicAction.chunk_size = 10
+	try:
+		# Test with and without headers
+		test_cases_1 = {True:"headers", False:"no headers"}
+		for test_val_1, test_desc_1 in test_cases_1.items():
+			inputs["headers"] = test_val_1
+			
+			# Test single, multiple and in-place outputs
+			test_cases_2 = {"test-output.csv":"single", "{{f}}-out{{e}}":"multiple", "{{f}}{{e}}":"in-place"}
+			for test_val_2, test_desc_2 in test_cases_2.items():
+				inputs["output"] = "{tmp}/" + test_val_2
+				
+				description = ["jobs", inputs["action"], test_desc_1, test_desc_2]
+				
+				rows = 20
+				contents_input = "".join("foo,{}\n\n".format(k) for k in range(rows))
+				contents_output = "".join('"bar","{}"\n'.format(k) for k in range(rows))
+				if test_desc_2 == "single": contents_output = contents_output * len(inputs["input"])
+				if inputs["headers"]:
+					contents_input = "field1,field2\n" + contents_input
+					contents_output = '"field1","field2"\n' + contents_output
+				
+				message = "Processed 60 records sucessfully"
+				
+				test_helper(", ".join(description), BasicAction, inputs, contents_input, contents_output, message)
+	finally:
+		BasicAction.chunk_size = chunk_size
+
+def test_jobs_files(inputs):
+	"""Test processing each file in its own worker process."""
+	
+	inputs.update({
+		"action" :"replace-value",
+		"column" :3,
+		"columns":"",
+		"find"   :"foo",
+		"replace":"bar",
+		"jobs"   :2,
+		"headers":False,
+		"output" :"{tmp}/{{f}}-out{{e}}"
+	})
+	
+	# Files with different numbers of records, the second one has a line that's missing the column
+	contents = {
+		"test-input-file1.csv":"".join("{},x,foo\n".format(k) for k in range(5)),
+		"test-input-file2.csv":"0,x,foo\nfoo\n",
+		"test-input-file3.csv":"".join("{},x,foo\n".format(k) for k in range(7))
+	}
+	filenames = {name:os.path.join(tempfile.gettempdir(), name) for name in contents}
+	outputs = [os.path.join(tempfile.gettempdir(), name.replace(".csv", "-out.csv")) for name in contents]
+	for (name, filename) in filenames.items(): writeall(contents[name], filename, inputs["encoding"])
+	
+	try:
+		# Test that the record counts of every file are summed
+		print2("Testing: jobs, files, record counts ")
+		action = BasicAction(dict(inputs, input=[filenames["test-input-file1.csv"], filenames["test-input-file3.csv"]], output=inputs["output"].format(tmp=tempfile.gettempdir())))
+		message = action.execute()
+		expected = "Processed 12 records sucessfully"
+		if message != expected:
+			print("FAIL\nExpected message: {}\nActual message: {}".format(expected, message))
+		elif readall(outputs[2], inputs["encoding"]) != "".join('"{}","x","bar"\n'.format(k) for k in range(7)):
+			print("FAIL\nWrong output")
+		else:
+			print("PASS")
+		
+		# Test that an error in one file is reported for that file after the others are processed
+		print2("Testing: jobs, files, errors ")
+		for f in outputs:
+			if os.path.exists(f): os.remove(f)
+		action = BasicAction(dict(inputs, input=list(filenames.values()), output=inputs["output"].format(tmp=tempfile.gettempdir())))
+		try:
+			action.execute()
+			print("FAIL\nNo error")
+		except ValueError as e:
+			expected = "'{0}': Column #3 does not exist on line 2 of '{0}'".format(filenames["test-input-file2.csv"])
+			if str(e) != expected:
+				print("FAIL\nExpected: {}\nActual: {}".format(expected, e))
+			elif not (os.path.exists(outputs[0]) and os.path.exists(outputs[2])):
+				print("FAIL\nOther files not processed")
+			else:
+				print("PASS")
+	finally:
+		for f in list(filenames.values()) + outputs:
+			if os.path.exists(f): os.remove(f)
+
+def test_engines(inputs):
+	"""Test that every parser engine produces the same records as the reference engine."""
+	
+	records = [
+		'foo,bar', 'foo,bar,', ',', '', '   ', '  ,  ', 'foo, bar ,baz ', '\tfoo\t,bar',
+		'"foo","bar"', ' "foo" , "bar" ', '"foo"bar,baz', '"foo" bar ,baz', '"foo', '"foo,bar',
+		'"fo""o",bar', '"""foo"""', '""', '"",""', '"foo""",bar', 'fo"o,bar', 'foo","bar',
+		'"foo\\"bar",baz', '"foo\\",bar', 'foo\\,bar', '"foo;bar";baz', "'foo';'bar'", 'é,"ü"'
+	]
+	
+	# Add random records built from the characters that matter to the parsers
+	rand = random.Random(0)
+	for x in range(5000): records.append("".join(rand.choice('ab ,;\t"\'\\') for y in range(rand.randint(0, 15))))
+	
+	# Test common dialects
+	test_cases_1 = {(",", '"', '"'):"comma", (",", '"', "\\"):"backslash escape", (",", '"', ""):"no escape", ("\t", "", ""):"tab, no enclose", (";", "'", "'"):"semicolon, single quote"}
+	for test_val_1, test_desc_1 in test_cases_1.items():
+		(inputs["delim"], inputs["enclose"], inputs["escape"]) = test_val_1
+		
+		description = ["engines", test_desc_1]
+		
+		print2("Testing: {} ".format(", ".join(description)))
+		
+		action = Action(dict(inputs))
+		failed = False
+		for record in records:
+			expected = action.parse_data(record, *test_val_1)
+			for engine in action.engines:
+				actual = getattr(action, action.engines[engine])(record, *test_val_1)
+				if actual != expected:
+					print("FAIL\nRecord: {!r}\nExpected: {!r}\nActual ({}): {!r}".format(record, expected, engine, actual))
+					failed = True
+					break
+			if failed: break
+		
+		if not failed: print("PASS")
+
+def test_engines_limit(inputs):
+	"""Test that every parser engine stops after the limit with the same values as the reference engine and the rest of the record untouched."""
+	
+	# Build random records from the characters that matter to the parsers
+	rand = random.Random(0)
+	records = ["".join(rand.choice('ab ,;\t"\'\\') for y in range(rand.randint(0, 15))) for x in range(5000)]
+	
+	# Test common dialects
+	test_cases_1 = {(",", '"', '"'):"comma", (",", '"', "\\"):"backslash escape", ("\t", "", ""):"tab, no enclose", (";", "'", "'"):"semicolon, single quote", (" ", '"', '"'):"space"}
+	for test_val_1, test_desc_1 in test_cases_1.items():
+		(inputs["delim"], inputs["enclose"], inputs["escape"]) = test_val_1
+		
+		description = ["engines", "limit", test_desc_1]
+		
+		print2("Testing: {} ".format(", ".join(description)))
+		
+		action = Action(dict(inputs))
+		failed = False
+		for record in records:
+			expected = action.parse_data(record, *test_val_1)
+			for limit in range(1, 5):
+				for engine in action.engines:
+					actual = getattr(action, action.engines[engine])(record, *test_val_1, limit)
+					
+					# The rest of the record must parse into the remaining values, a blank rest is one empty value
+					if len(actual) > limit:
+						rest = actual[limit]
+						ok = record.endswith(rest) and ((actual[:limit] + (action.parse_data(rest, *test_val_1) or [""])) == expected)
+					else:
+						ok = (actual == expected)
+					
+					if not ok:
+						print("FAIL\nRecord: {!r}\nLimit: {}\nExpected: {!r}\nActual ({}): {!r}".format(record, limit, expected, engine, actual))
+						failed = True
+						break
+				if failed: break
+			if failed: break
+		
+		if not failed: print("PASS")
+
+def test_filter_prefilter(inputs):
+	"""Test that filtering lines by the string every match contains gives the same results as parsing every line."""
+	
+	patterns = ["ab", "a b", "b,a", 'a"b', "(a)b", "a+b", "ab|ba", "(?i)ab", "(?i:a)b", "^ab", "b$", "\\bab", "a(?=b)b", "a\\\\b", "a.b", ","]
+	
+	# Build random values from the characters that matter to the parsers
+	rand = random.Random(0)
+	pieces = ["a", "b", "ab", 'a"', '"b', "a'", "'b", " ", ",", ";", "\t", '"', "'", "\\"]
+	values = ["".join(rand.choice(pieces) for y in range(rand.randint(0, 6))) for x in range(5000)]
+	
+	# Test common dialects
+	test_cases_1 = {(",", '"', '"'):"comma", (",", '"', "\\"):"backslash escape", ("\t", "", ""):"tab, no enclose", (";", "'", "'"):"semicolon, single quote"}
+	for test_val_1, test_desc_1 in test_cases_1.items():
+		(inputs["delim"], inputs["enclose"], inputs["escape"]) = test_val_1
+		
+		description = ["filter", "prefilter", test_desc_1]
+		
+		print2("Testing: {} ".format(", ".join(description)))
+		
+		# Use the values as they are and enclosed and escaped in records
+		records = ["{}{}{}".format(values[x], inputs["delim"], values[x+1]) for x in range(0, len(values), 4)]
+		records += [Action.unparse_data(None, values[x:x+2], *test_val_1) for x in range(2, len(values), 4)]
+		
+		failed = False
+		for pattern in patterns:
+			for invert in [False, True]:
+				inputs.update({"action":"filter", "column":1, "columns":"", "pattern":pattern, "invert":invert, "keys":"", "plan":False, "cache":0, "engine":"csv", "pipeline":""})
+				(prefiltered, parsed) = (BasicAction(dict(inputs)), BasicAction(dict(inputs)))
+				for action in [prefiltered, parsed]: action.initialize()
+				parsed.prefilter = None
+				
+				for record in records:
+					# Lines without the column must be the same error either way
+					results = []
+					for action in [parsed, prefiltered]:
+						try:
+							results.append(action.process(record, False, 0, "test"))
+						except (ValueError, IndexError) as e:
+							results.append(repr(e))
+					(expected, actual) = results
+					if actual != expected:
+						print("FAIL\nPattern: {!r}\nRecord: {!r}\nExpected: {!r}\nActual: {!r}".format(pattern, record, expected, actual))
+						failed = True
+						break
+				if failed: break
+			if failed: break
+		
+		if not failed: print("PASS")
+	
+	# Test that a short record is an error even when its enclosed value contains delimiters
+	inputs.update({"delim":",", "enclose":'"', "escape":'"', "column":3, "pattern":"zzz", "invert":False, "headers":False, "input":["{tmp}/test-input-file.csv"]})
+	print2("Testing: filter, prefilter, enclosed delimiters ")
+	filename = inputs["input"][0].format(tmp=tempfile.gettempdir())
+	writeall('a,b,c\n"x,y,z"\n', filename, inputs["encoding"])
+	action = BasicAction(dict(inputs, input=[filename], output="{}/test-output.csv".format(tempfile.gettempdir())))
+	try:
+		print("FAIL\nNo error: {}".format(action.execute()))
+	except ValueError as e:
+		expected = "Column #3 does not exist on line 2 of '{}'".format(filename)
+		if str(e) != expected:
+			print("FAIL\nExpected: {}\nActual: {}".format(expected, e))
+		else:
+			print("PASS")
+	finally:
+		for f in [filename, action.inputs["output"]]:
+			if os.path.exists(f): os.remove(f)
+
+def test_type_classifier(inputs):
+	"""Test that the type classifier parses date and time values the same way as strptime."""
+	
+	values = [
+		"2017-07-16", "2017-7-6", "2017-02-30", "07/16/17", "7/ 6/17", "16.07.2017", "16 July 2017", "July 16, 2017", "16-jul-17",
+		"13:00", "13:00:61", "1:05 PM", "01:05:09 am", "2017-07-16 15:00:00", "07/16/17 3:00 pm", "2017-07-16  15:00",
+		"2017-07-16x", "17-07-16", "0000-01-01", "", "foo", "1:234"
+	]
+	
+	# Add random values built from the pieces that matter to the formats
+	rand = random.Random(0)
+	pieces = ["2017", "17", "07", "7", " 7", "31", "13", "00", "61", "Jul", "July", "AM", "pm", "/", "-", ".", " ", ", ", ":"]
+	for x in range(2000): values.append("".join(rand.choice(pieces) for y in range(rand.randint(1, 8))))
+	
+	print2("Testing: type classifier ")
+	
+	classifier = TypeClassifier()
+	for key, formats in classifier.formats.items():
+		for value in values:
+			expected = (None, None)
+			for format in formats:
+				try:
+					expected = (datetime.strptime(value, format), format)
+					break
+				except Exception as e:
+					pass
+			
+			actual = classifier.parse(key, value)
+			if actual != expected:
+				print("FAIL\nValue: {!r}\nExpected: {!r}\nActual: {!r}".format(value, expected, actual))
+				return
+	
+	print("PASS")
+
+def test_data_reader(inputs):
+	"""Test that the data readers split lines the same way for every block size."""
+	
+	filename = "{tmp}/test-input-file.csv".format(tmp=tempfile.gettempdir())
+	contents_input = "foo\r\nbar\n\nbaz\rqux\r\n\r\nquux"
+	contents_output = [("foo", "\r\n", 5), ("bar", "\n", 9), ("baz", "\r", 14), ("qux", "\r\n", 19), ("quux", "", 25)]
+	
+	with open(filename, mode="w", encoding=inputs["encoding"], newline="") as f: f.write(contents_input)
+	try:
+		# Test the block and memory mapped readers
+		test_cases_1 = {DataReader:"blocks", MappedDataReader:"memory mapped"}
+		for test_val_1, test_desc_1 in test_cases_1.items():
+			# Test blocks that split lines and line endings
+			test_cases_2 = {1:"1 byte blocks", 4:"4 byte blocks", None:"default blocks"}
+			for test_val_2, test_desc_2 in test_cases_2.items():
+				description = ["data reader", test_desc_1, test_desc_2]
+				
+				print2("Testing: {} ".format(", ".join(description)))
+				
+				with open(filename, mode="r", encoding=inputs["encoding"], newline="") as f:
+					reader = test_val_1(f, test_val_2)
+					actual = [(line, reader.linesep, reader.bytes) for line in reader]
+				
+				if actual != contents_output:
+					print("FAIL\nExpected lines: {!r}\nActual lines: {!r}".format(contents_output, actual))
+				else:
+					print("PASS")
+	finally:
+		os.remove(filename)
+
+def test_progress_timer(inputs):
+	"""Test that progress is only reported once every interval, checking the clock every so many records."""
+	
+	now = [1000.0]
+	clock = time.time
+	time.time = lambda: now[0]
+	try:
+		# Test that the clock is checked on the first record and then every ProgressTimer.records records
+		print2("Testing: progress timer, countdown ")
+		timer = ProgressTimer(250)
+		actual = []
+		for k in range(3 * ProgressTimer.records):
+			now[0] += 1
+			if timer.due(): actual.append(k)
+		expected = [0, ProgressTimer.records, 2 * ProgressTimer.records]
+		if actual != expected:
+			print("FAIL\nExpected: {}\nActual: {}".format(expected, actual))
+		else:
+			print("PASS")
+		
+		# Test that nothing is reported before the interval has passed
+		print2("Testing: progress timer, interval ")
+		timer = ProgressTimer(250)
+		actual = []
+		for step in [0, 0.1, 0.1, 0.1]:
+			now[0] += step
+			actual.append(any([timer.due() for k in range(ProgressTimer.records)]))
+		expected = [True, False, False, True]
+		if actual != expected:
+			print("FAIL\nExpected: {}\nActual: {}".format(expected, actual))
+		else:
+			print("PASS")
+		
+		# Test that an interval of 0 disables progress updates
+		print2("Testing: progress timer, disabled ")
+		timer = ProgressTimer(0)
+		now[0] += 3600
+		if any(timer.due() for k in range(3 * ProgressTimer.records)):
+			print("FAIL\nProgress reported")
+		else:
+			print("PASS")
+	finally:
+		time.time = clock
+
+def test_mapped_close(inputs):
+	"""Test that memory maps are released when reading stops before the end of the file."""
+	
+	inputs.update({
+		"action" :"head",
+		"lines"  :2,
+		"mmap"   :True,
+		"headers":False,
+		"input"  :["{tmp}/test-input-file.csv"],
+		"output" :"{tmp}/{{f}}{{e}}"
+	})
+	
+	# Keep every reader that's created
+	readers = []
+	init = MappedDataReader.__init__
+	def record(self, *args, **kwargs):
+		init(self, *args, **kwargs)
+		readers.append(self)
+	
+	MappedDataReader.__init__ = record
+	try:
+		test_helper("mmap, head, in-place", BasicAction, inputs, "foo,bar\n" * 10, "foo,bar\n" * 2, "Processed 2 records sucessfully")
+	finally:
+		MappedDataReader.__init__ = init
+	
+	print2("Testing: mmap, head, released ")
+	if (len(readers) == 0) or any(not reader.map.closed for reader in readers):
+		print("FAIL\nMemory map not released")
+	else:
+		print("PASS")
+
 def test_helper(description, action, inputs, contents_input, contents_output, expected_message):
 	"""Test helper."""
 	
@@ -656,7 +1666,10 @@ def main():
 		
 		test_combine(conf.conf.copy())
 		test_filter(conf.conf.copy())
+		test_filter_keys(conf.conf.copy())
+		test_pipeline(conf.conf.copy())
 		test_head(conf.conf.copy())
+		test_tail(conf.conf.copy())
 		test_remove_columns(conf.conf.copy())
 		test_repair(conf.conf.copy())
 		test_replace_pattern(conf.conf.copy())
@@ -664,14 +1677,40 @@ def main():
 		
 		test_delim_to_fixed(conf.conf.copy())
 		test_fixed_to_delim(conf.conf.copy())
+		test_fixed_window(conf.conf.copy())
 		
 		test_split_lines(conf.conf.copy())
+		test_split_parts(conf.conf.copy())
 		test_split_value(conf.conf.copy())
 		
 		test_analyze(conf.conf.copy())
+		test_analyze_sketch(conf.conf.copy())
+		test_analyze_sample(conf.conf.copy())
+		test_analyze_options(conf.conf.copy())
+		test_analyze_jobs(conf.conf.copy())
+		test_analyze_profile(conf.conf.copy())
 		test_sql_import(conf.conf.copy())
+		if numpy is not None:
+			test_analyze(dict(conf.conf, engine="numpy"))
+			test_sql_import(dict(conf.conf, engine="numpy"))
+			test_delim_to_fixed(dict(conf.conf, engine="numpy"))
+			test_fixed_to_delim(dict(conf.conf, engine="numpy"))
+			test_fixed_batches(conf.conf.copy())
 		
 		test_sql_prepare(conf.conf.copy())
+		test_sql_prepare_cache(conf.conf.copy())
+		test_sql_prepare_plan(conf.conf.copy())
+		
+		test_jobs(conf.conf.copy())
+		test_jobs_files(conf.conf.copy())
+		
+		test_engines(conf.conf.copy())
+		test_engines_limit(conf.conf.copy())
+		test_filter_prefilter(conf.conf.copy())
+		test_type_classifier(conf.conf.copy())
+		test_data_reader(conf.conf.copy())
+		test_progress_timer(conf.conf.copy())
+		test_mapped_close(conf.conf.copy())
 		
 		print("")
 	except Exception as e: